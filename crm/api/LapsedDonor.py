@@ -1,35 +1,45 @@
+import hashlib
+import json
+
 import frappe
-from frappe.utils import nowdate
+from frappe import _
+from frappe.utils import add_days, cint, nowdate
+from frappe.utils.background_jobs import enqueue
+
+from crm.api.email_group import update_subscriber_count
+from crm.api.list_count import bump_count_cache_version
+
+LAPSED_DONOR_SYNC_BATCH_SIZE = 5000
+
+PAYMENT_FILTERS = {
+    "campaign": "dn.campaign",
+    "fund_class": "pd.fund_class",
+    "pay_service_area": "pd.pay_service_area",
+    "pay_subservice_area": "pd.pay_subservice_area",
+    "pay_product": "pd.pay_product",
+}
+TIME_PERIODS = {"3": 90, "6": 180, "12": 360}
+
+
+def get_lapsed_donor_conditions(filters=None):
+    """Payment level conditions (with their values) and the lapse interval in days for `filters`."""
+    filters = frappe.parse_json(filters) if isinstance(filters, str) else filters
+    if not isinstance(filters, dict):
+        return "", {}, 720
+
+    conditions, values = "", {}
+    for key, column in PAYMENT_FILTERS.items():
+        if filters.get(key):
+            conditions += f" AND {column} = %({key})s"
+            values[key] = filters.get(key)
+
+    return conditions, values, TIME_PERIODS.get(str(filters.get("time_period")), 720)
+
 
 @frappe.whitelist()
 def get_lapsed_donor_dashboard(filters=None):
 
-    conditions = ""
-    if filters and isinstance(filters, dict):
-        if filters.get("campaign"):
-            campaign = filters.get("campaign")
-            conditions += f" AND dn.campaign = '{campaign}'"
-        if filters.get("fund_class"):
-            fund_class = filters.get("fund_class")
-            conditions += f" AND pd.fund_class = '{fund_class}'"
-        if filters.get("pay_service_area"):
-            pay_service_area = filters.get("pay_service_area")
-            conditions += f" AND pd.pay_service_area = '{pay_service_area}'"
-        if filters.get("pay_subservice_area"):
-            pay_subservice_area = filters.get("pay_subservice_area")
-            conditions += f" AND pd.pay_subservice_area = '{pay_subservice_area}'"
-        if filters.get("pay_product"):
-            pay_product = filters.get("pay_product")
-            conditions += f" AND pd.pay_product = '{pay_product}'"
-        
-        if filters.get("time_period") == '3':
-            interval = 90
-        elif filters.get("time_period") == '6':
-            interval = 180
-        elif filters.get("time_period") == '12':
-            interval = 360
-        else:
-            interval = 720
+    conditions, values, interval = get_lapsed_donor_conditions(filters)
 
     total_active_donors_row = frappe.db.sql("""
         SELECT COUNT(*) AS total_active_donors
@@ -38,6 +48,13 @@ def get_lapsed_donor_dashboard(filters=None):
     """, as_dict=True)
     total_active_donors = (total_active_donors_row[0].total_active_donors if total_active_donors_row else 0) or 0
 
+    if not conditions:
+        # no payment level filters, answer from the per donor summary
+        return {
+            "total_active_donors": total_active_donors,
+            **get_lapsed_donors_from_summary(interval),
+        }
+
     total_lapsed_row = frappe.db.sql(f"""
         SELECT COUNT(*) AS total_lapsed_donors
         FROM (
@@ -51,7 +68,7 @@ def get_lapsed_donor_dashboard(filters=None):
             GROUP BY d.name
             HAVING last_due_date < (CURDATE() - INTERVAL {interval} DAY)
         ) t
-    """, as_dict=True)
+    """, values, as_dict=True)
     total_lapsed_donors = (total_lapsed_row[0].total_lapsed_donors if total_lapsed_row else 0) or 0
 
     lapsed_donors_list = frappe.db.sql(f"""
@@ -73,7 +90,7 @@ def get_lapsed_donor_dashboard(filters=None):
             d.name, d.donor_name, d.email
         HAVING 
             last_donation_date < (CURDATE() - INTERVAL {interval} DAY)
-    """, as_dict=True)
+    """, values, as_dict=True)
 
     return {
         "total_active_donors": total_active_donors,
@@ -82,6 +99,185 @@ def get_lapsed_donor_dashboard(filters=None):
     }
 
 
+def get_lapsed_donors_from_summary(interval):
+    """Active donors whose last submitted donation is older than `interval` days, from CRM Donor Summary."""
+    cutoff = add_days(nowdate(), -interval)
+
+    total_lapsed_donors = frappe.db.sql("""
+        SELECT COUNT(*)
+        FROM `tabCRM Donor Summary` AS s
+        JOIN `tabDonor` AS d ON d.name = s.donor
+        WHERE d.status = 'Active' AND s.last_donation_date < %(cutoff)s
+    """, {"cutoff": cutoff})[0][0]
+
+    lapsed_donors_list = frappe.db.sql("""
+        SELECT 
+            d.name AS donor_id,
+            d.donor_name,
+            d.email,
+            s.last_donation_date,
+            s.lifetime_total AS total_donations
+        FROM 
+            `tabCRM Donor Summary` AS s
+        JOIN 
+            `tabDonor` AS d ON d.name = s.donor
+        WHERE 
+            d.status = 'Active' AND s.last_donation_date < %(cutoff)s
+    """, {"cutoff": cutoff}, as_dict=True)
+
+    return {
+        "total_lapsed_donors": total_lapsed_donors or 0,
+        "lapsed_donors_list": lapsed_donors_list or []
+    }
+
+
+def get_lapsed_donor_segment(filters=None):
+    """SQL selecting `email` of lapsed active donors matching `filters`, with its values."""
+    conditions, values, interval = get_lapsed_donor_conditions(filters)
+    values["cutoff"] = add_days(nowdate(), -interval)
+
+    if not conditions:
+        return """
+            SELECT d.email
+            FROM `tabCRM Donor Summary` AS s
+            JOIN `tabDonor` AS d ON d.name = s.donor
+            WHERE d.status = 'Active' AND s.last_donation_date < %(cutoff)s
+        """, values
+
+    return f"""
+        SELECT d.email
+        FROM `tabDonor` AS d
+        JOIN `tabPayment Detail` AS pd ON pd.donor = d.name
+        JOIN `tabDonation` AS dn ON dn.name = pd.parent
+        WHERE d.status = 'Active' AND dn.docstatus = 1 {conditions}
+        GROUP BY d.name, d.email
+        HAVING MAX(dn.due_date) < %(cutoff)s
+    """, values
+
+
+@frappe.whitelist()
+def sync_lapsed_donors_to_email_group(email_group, filters=None):
+    """Enqueue adding every lapsed donor matching `filters` to `email_group`. Progress is
+    published as `lapsed_donor_sync_progress`."""
+    frappe.has_permission("Email Group", "write", email_group, throw=True)
+
+    filters = frappe.parse_json(filters) if isinstance(filters, str) else filters
+    segment = hashlib.sha1(json.dumps(filters or {}, sort_keys=True, default=str).encode()).hexdigest()
+    job_id = f"lapsed_donor_sync:{email_group}:{segment[:12]}"
+
+    job = enqueue(
+        method=run_lapsed_donor_sync,
+        queue="long",
+        timeout=1800,
+        job_name=f"Sync Lapsed Donors to {email_group}",
+        job_id=job_id,
+        deduplicate=True,
+        email_group=email_group,
+        filters=filters,
+        user=frappe.session.user,
+    )
+    if not job:
+        # the same segment is already being synced into this group
+        return {"status": "Already Running", "job_id": job_id}
+    return {"status": "Queued", "job_id": job.id}
+
+
+def run_lapsed_donor_sync(email_group, filters=None, user=None):
+    """
+    Materialize the lapsed donor segment into `email_group` with set based inserts, in batches of
+    distinct emails. Existing members are left alone, so people who unsubscribed from the group
+    stay unsubscribed, and globally unsubscribed emails are skipped.
+    """
+    segment, values = get_lapsed_donor_segment(filters)
+    values["email_group"] = email_group
+    emails = f"SELECT DISTINCT seg.email FROM ({segment}) AS seg WHERE IFNULL(seg.email, '') != ''"
+
+    try:
+        total = cint(frappe.db.sql(f"SELECT COUNT(*) FROM ({emails}) AS e", values)[0][0])
+        initial_members = frappe.db.count("Email Group Member", {"email_group": email_group})
+        processed = added = 0
+        after = ""
+
+        while True:
+            batch = frappe.db.sql(
+                f"{emails} AND seg.email > %(after)s ORDER BY seg.email LIMIT %(limit)s",
+                {**values, "after": after, "limit": LAPSED_DONOR_SYNC_BATCH_SIZE},
+                pluck=True,
+            )
+            if not batch:
+                break
+
+            frappe.db.sql(
+                f"""
+                INSERT INTO `tabEmail Group Member`
+                    (name, creation, modified, owner, modified_by, email_group, email, unsubscribed)
+                SELECT
+                    SUBSTRING(SHA1(CONCAT(%(email_group)s, ':', e.email)), 1, 10),
+                    NOW(), NOW(), %(user)s, %(user)s, %(email_group)s, e.email, 0
+                FROM ({emails} AND seg.email > %(after)s AND seg.email <= %(last)s) AS e
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM `tabEmail Group Member` AS m
+                    WHERE m.email_group = %(email_group)s AND m.email = e.email
+                )
+                AND NOT EXISTS (
+                    SELECT 1 FROM `tabEmail Unsubscribe` AS u
+                    WHERE u.email = e.email AND (
+                        u.global_unsubscribe = 1
+                        OR (u.reference_doctype = 'Email Group' AND u.reference_name = %(email_group)s)
+                    )
+                )
+                """,
+                {**values, "after": after, "last": batch[-1], "user": user or frappe.session.user},
+            )
+            added = frappe.db.count("Email Group Member", {"email_group": email_group}) - initial_members
+            processed += len(batch)
+            after = batch[-1]
+            frappe.db.commit()
+
+            frappe.publish_realtime(
+                "lapsed_donor_sync_progress",
+                {
+                    "status": "In Progress",
+                    "email_group": email_group,
+                    "processed": processed,
+                    "added": added,
+                    "total": total,
+                },
+                user=user,
+            )
+
+        bump_count_cache_version("Email Group Member")
+        update_subscriber_count(email_group)
+        frappe.db.commit()
+    except Exception as e:
+        frappe.db.rollback()
+        frappe.log_error(title="Lapsed Donor Sync Failed", message=frappe.get_traceback())
+        frappe.publish_realtime(
+            "lapsed_donor_sync_progress",
+            {
+                "status": "Failed",
+                "email_group": email_group,
+                "message": _("Lapsed donor sync failed: {0}").format(str(e)),
+            },
+            user=user,
+        )
+        raise
+
+    frappe.publish_realtime(
+        "lapsed_donor_sync_progress",
+        {
+            "status": "Completed",
+            "email_group": email_group,
+            "processed": processed,
+            "added": added,
+            "total": total,
+            "message": _("{0} donors added to {1}").format(added, email_group),
+        },
+        user=user,
+    )
+    return {"added": added, "total": total}
+
+
 # @frappe.whitelist()
 # def send_lapsed_donor_emails(group_name):
 #     """Send email to all members of a given email group using the default outgoing account."""
@@ -1,13 +1,18 @@
+import heapq
 import json
+from itertools import islice
 
 import frappe  # type: ignore
 from bs4 import BeautifulSoup
 from frappe import _  # type: ignore
 from frappe.desk.form.load import get_docinfo  # type: ignore
-from frappe.query_builder import JoinType  # type: ignore
+from frappe.query_builder import JoinType, Order  # type: ignore
 from frappe.exceptions import DoesNotExistError  # type: ignore
+from frappe.utils import cint  # type: ignore
+from pypika import Criterion
 
-from crm.fcrm.doctype.crm_call_log.crm_call_log import parse_call_log
+from crm.api.doc import decode_cursor, encode_cursor
+from crm.fcrm.doctype.crm_call_log.crm_call_log import parse_call_logs
 
 
 @frappe.whitelist()
@@ -115,10 +120,9 @@ def get_default_cost_center():
 def get_deal_activities(name):
 	get_docinfo("", "CRM Deal", name)
 	docinfo = frappe.response["docinfo"]
-	deal_meta = frappe.get_meta("CRM Deal")
-	deal_fields = {
-		field.fieldname: {"label": field.label, "options": field.options} for field in deal_meta.fields
-	}
+	timeline_attachments = get_timeline_attachments(
+		docinfo.comments, docinfo.communications + docinfo.automated_messages
+	)
 	avoid_fields = [
 		"lead",
 		"response_by",
@@ -152,54 +156,8 @@ def get_deal_activities(name):
 		}
 	)
 
-	docinfo.versions.reverse()
-
-	for version in docinfo.versions:
-		data = json.loads(version.data)
-		if not data.get("changed"):
-			continue
-
-		if change := data.get("changed")[0]:
-			field = deal_fields.get(change[0], None)
-
-			if not field or change[0] in avoid_fields or (not change[1] and not change[2]):
-				continue
-
-			field_label = field.get("label") or change[0]
-			field_option = field.get("options") or None
-
-			activity_type = "changed"
-			data = {
-				"field": change[0],
-				"field_label": field_label,
-				"old_value": change[1],
-				"value": change[2],
-			}
-
-			if not change[1] and change[2]:
-				activity_type = "added"
-				data = {
-					"field": change[0],
-					"field_label": field_label,
-					"value": change[2],
-				}
-			elif change[1] and not change[2]:
-				activity_type = "removed"
-				data = {
-					"field": change[0],
-					"field_label": field_label,
-					"value": change[1],
-				}
-
-		activity = {
-			"activity_type": activity_type,
-			"creation": version.creation,
-			"owner": version.owner,
-			"data": data,
-			"is_lead": False,
-			"options": field_option,
-		}
-		activities.append(activity)
+	for activity in get_version_activities("CRM Deal", name, avoid_fields):
+		activities.append({**activity, "is_lead": False})
 
 	for comment in docinfo.comments:
 		activity = {
@@ -208,7 +166,7 @@ def get_deal_activities(name):
 			"creation": comment.creation,
 			"owner": comment.owner,
 			"content": comment.content,
-			"attachments": get_attachments("Comment", comment.name),
+			"attachments": timeline_attachments.get(("Comment", comment.name), []),
 			"is_lead": False,
 		}
 		activities.append(activity)
@@ -227,7 +185,7 @@ def get_deal_activities(name):
 				"recipients": communication.recipients,
 				"cc": communication.cc,
 				"bcc": communication.bcc,
-				"attachments": get_attachments("Communication", communication.name),
+				"attachments": timeline_attachments.get(("Communication", communication.name), []),
 				"read_by_recipient": communication.read_by_recipient,
 				"delivery_status": communication.delivery_status,
 			},
@@ -246,9 +204,10 @@ def get_deal_activities(name):
 		}
 		activities.append(activity)
 
-	calls = calls + get_linked_calls(name).get("calls", [])
-	notes = notes + get_linked_notes(name) + get_linked_calls(name).get("notes", [])
-	tasks = tasks + get_linked_tasks(name) + get_linked_calls(name).get("tasks", [])
+	linked_calls = get_linked_calls(name)
+	calls = calls + linked_calls.get("calls", [])
+	notes = notes + get_linked_notes(name) + linked_calls.get("notes", [])
+	tasks = tasks + get_linked_tasks(name) + linked_calls.get("tasks", [])
 	attachments = attachments + get_attachments("CRM Deal", name)
 
 	activities.sort(key=lambda x: x["creation"], reverse=True)
@@ -260,10 +219,9 @@ def get_deal_activities(name):
 def get_lead_activities(name):
 	get_docinfo("", "CRM Lead", name)
 	docinfo = frappe.response["docinfo"]
-	lead_meta = frappe.get_meta("CRM Lead")
-	lead_fields = {
-		field.fieldname: {"label": field.label, "options": field.options} for field in lead_meta.fields
-	}
+	timeline_attachments = get_timeline_attachments(
+		docinfo.comments, docinfo.communications + docinfo.automated_messages
+	)
 	avoid_fields = [
 		"converted",
 		"response_by",
@@ -284,54 +242,8 @@ def get_lead_activities(name):
 		}
 	]
 
-	docinfo.versions.reverse()
-
-	for version in docinfo.versions:
-		data = json.loads(version.data)
-		if not data.get("changed"):
-			continue
-
-		if change := data.get("changed")[0]:
-			field = lead_fields.get(change[0], None)
-
-			if not field or change[0] in avoid_fields or (not change[1] and not change[2]):
-				continue
-
-			field_label = field.get("label") or change[0]
-			field_option = field.get("options") or None
-
-			activity_type = "changed"
-			data = {
-				"field": change[0],
-				"field_label": field_label,
-				"old_value": change[1],
-				"value": change[2],
-			}
-
-			if not change[1] and change[2]:
-				activity_type = "added"
-				data = {
-					"field": change[0],
-					"field_label": field_label,
-					"value": change[2],
-				}
-			elif change[1] and not change[2]:
-				activity_type = "removed"
-				data = {
-					"field": change[0],
-					"field_label": field_label,
-					"value": change[1],
-				}
-
-		activity = {
-			"activity_type": activity_type,
-			"creation": version.creation,
-			"owner": version.owner,
-			"data": data,
-			"is_lead": True,
-			"options": field_option,
-		}
-		activities.append(activity)
+	for activity in get_version_activities("CRM Lead", name, avoid_fields):
+		activities.append({**activity, "is_lead": True})
 
 	for comment in docinfo.comments:
 		activity = {
@@ -340,7 +252,7 @@ def get_lead_activities(name):
 			"creation": comment.creation,
 			"owner": comment.owner,
 			"content": comment.content,
-			"attachments": get_attachments("Comment", comment.name),
+			"attachments": timeline_attachments.get(("Comment", comment.name), []),
 			"is_lead": True,
 		}
 		activities.append(activity)
@@ -359,7 +271,7 @@ def get_lead_activities(name):
 				"recipients": communication.recipients,
 				"cc": communication.cc,
 				"bcc": communication.bcc,
-				"attachments": get_attachments("Communication", communication.name),
+				"attachments": timeline_attachments.get(("Communication", communication.name), []),
 				"read_by_recipient": communication.read_by_recipient,
 				"delivery_status": communication.delivery_status,
 			},
@@ -378,9 +290,10 @@ def get_lead_activities(name):
 		}
 		activities.append(activity)
 
-	calls = get_linked_calls(name).get("calls", [])
-	notes = get_linked_notes(name) + get_linked_calls(name).get("notes", [])
-	tasks = get_linked_tasks(name) + get_linked_calls(name).get("tasks", [])
+	linked_calls = get_linked_calls(name)
+	calls = linked_calls.get("calls", [])
+	notes = get_linked_notes(name) + linked_calls.get("notes", [])
+	tasks = get_linked_tasks(name) + linked_calls.get("tasks", [])
 	attachments = get_attachments("CRM Lead", name)
 
 	activities.sort(key=lambda x: x["creation"], reverse=True)
@@ -392,10 +305,9 @@ def get_lead_activities(name):
 def get_donor_activities(name):
 	get_docinfo("", "Donor", name)
 	docinfo = frappe.response["docinfo"]
-	donor_meta = frappe.get_meta("Donor")
-	donor_fields = {
-		field.fieldname: {"label": field.label, "options": field.options} for field in donor_meta.fields
-	}
+	timeline_attachments = get_timeline_attachments(
+		docinfo.comments, docinfo.communications + docinfo.automated_messages
+	)
 	avoid_fields = [
 		"converted",
 		"response_by",
@@ -416,54 +328,8 @@ def get_donor_activities(name):
 		}
 	]
 
-	docinfo.versions.reverse()
-
-	for version in docinfo.versions:
-		data = json.loads(version.data)
-		if not data.get("changed"):
-			continue
-
-		if change := data.get("changed")[0]:
-			field = donor_fields.get(change[0], None)
-
-			if not field or change[0] in avoid_fields or (not change[1] and not change[2]):
-				continue
-
-			field_label = field.get("label") or change[0]
-			field_option = field.get("options") or None
-
-			activity_type = "changed"
-			data = {
-				"field": change[0],
-				"field_label": field_label,
-				"old_value": change[1],
-				"value": change[2],
-			}
-
-			if not change[1] and change[2]:
-				activity_type = "added"
-				data = {
-					"field": change[0],
-					"field_label": field_label,
-					"value": change[2],
-				}
-			elif change[1] and not change[2]:
-				activity_type = "removed"
-				data = {
-					"field": change[0],
-					"field_label": field_label,
-					"value": change[1],
-				}
-
-		activity = {
-			"activity_type": activity_type,
-			"creation": version.creation,
-			"owner": version.owner,
-			"data": data,
-			"is_lead": False,
-			"options": field_option,
-		}
-		activities.append(activity)
+	for activity in get_version_activities("Donor", name, avoid_fields):
+		activities.append({**activity, "is_lead": False})
 
 	for comment in docinfo.comments:
 		activity = {
@@ -472,7 +338,7 @@ def get_donor_activities(name):
 			"creation": comment.creation,
 			"owner": comment.owner,
 			"content": comment.content,
-			"attachments": get_attachments("Comment", comment.name),
+			"attachments": timeline_attachments.get(("Comment", comment.name), []),
 			"is_lead": False,
 		}
 		activities.append(activity)
@@ -491,7 +357,7 @@ def get_donor_activities(name):
 				"recipients": communication.recipients,
 				"cc": communication.cc,
 				"bcc": communication.bcc,
-				"attachments": get_attachments("Communication", communication.name),
+				"attachments": timeline_attachments.get(("Communication", communication.name), []),
 				"read_by_recipient": communication.read_by_recipient,
 				"delivery_status": communication.delivery_status,
 			},
@@ -510,9 +376,10 @@ def get_donor_activities(name):
 		}
 		activities.append(activity)
 
-	calls = get_linked_calls(name).get("calls", [])
-	notes = get_linked_notes(name) + get_linked_calls(name).get("notes", [])
-	tasks = get_linked_tasks(name) + get_linked_calls(name).get("tasks", [])
+	linked_calls = get_linked_calls(name)
+	calls = linked_calls.get("calls", [])
+	notes = get_linked_notes(name) + linked_calls.get("notes", [])
+	tasks = get_linked_tasks(name) + linked_calls.get("tasks", [])
 	attachments = get_attachments("Donor", name)
 
 	activities.sort(key=lambda x: x["creation"], reverse=True)
@@ -523,10 +390,9 @@ def get_donor_activities(name):
 def get_donation_activities(name):
 	get_docinfo("", "Donation", name)
 	docinfo = frappe.response["docinfo"]
-	donation_meta = frappe.get_meta("Donation")
-	donation_fields = {
-		field.fieldname: {"label": field.label, "options": field.options} for field in donation_meta.fields
-	}
+	timeline_attachments = get_timeline_attachments(
+		docinfo.comments, docinfo.communications + docinfo.automated_messages
+	)
 	avoid_fields = []
 
 	doc = frappe.db.get_values("Donation", name, ["creation", "owner"])[0]
@@ -540,53 +406,8 @@ def get_donation_activities(name):
 		}
 	]
 
-	docinfo.versions.reverse()
-
-	for version in docinfo.versions:
-		data = json.loads(version.data)
-		if not data.get("changed"):
-			continue
-
-		if change := data.get("changed")[0]:
-			field = donation_fields.get(change[0], None)
-			if not field or change[0] in avoid_fields or (not change[1] and not change[2]):
-				continue
-
-			field_label = field.get("label") or change[0]
-			field_option = field.get("options") or None
-
-			activity_type = "changed"	
-			data = {
-				"field": change[0],
-				"field_label": field_label,
-				"old_value": change[1],
-				"value": change[2],
-			}
-
-			if not change[1] and change[2]:
-				activity_type = "added"
-				data = {
-					"field": change[0],
-					"field_label": field_label,
-					"value": change[2],
-				}
-			elif change[1] and not change[2]:
-				activity_type = "removed"
-				data = {
-					"field": change[0],
-					"field_label": field_label,
-					"value": change[1],
-				}
-
-		activity = {
-			"activity_type": activity_type,
-			"creation": version.creation,
-			"owner": version.owner,
-			"data": data,
-			"is_lead": False,
-			"options": field_option,
-		}
-		activities.append(activity)
+	for activity in get_version_activities("Donation", name, avoid_fields):
+		activities.append({**activity, "is_lead": False})
 
 	for comment in docinfo.comments:
 		activity = {
@@ -595,7 +416,7 @@ def get_donation_activities(name):
 			"creation": comment.creation,
 			"owner": comment.owner,
 			"content": comment.content,
-			"attachments": get_attachments("Comment", comment.name),
+			"attachments": timeline_attachments.get(("Comment", comment.name), []),
 			"is_lead": False,
 		}
 		activities.append(activity)
@@ -614,7 +435,7 @@ def get_donation_activities(name):
 				"recipients": communication.recipients,
 				"cc": communication.cc,
 				"bcc": communication.bcc,
-				"attachments": get_attachments("Communication", communication.name),
+				"attachments": timeline_attachments.get(("Communication", communication.name), []),
 				"read_by_recipient": communication.read_by_recipient,
 				"delivery_status": communication.delivery_status,
 			},
@@ -633,9 +454,10 @@ def get_donation_activities(name):
 		}
 		activities.append(activity)
 
-	calls = get_linked_calls(name).get("calls", [])
-	notes = get_linked_notes(name) + get_linked_calls(name).get("notes", [])
-	tasks = get_linked_tasks(name) + get_linked_calls(name).get("tasks", [])
+	linked_calls = get_linked_calls(name)
+	calls = linked_calls.get("calls", [])
+	notes = get_linked_notes(name) + linked_calls.get("notes", [])
+	tasks = get_linked_tasks(name) + linked_calls.get("tasks", [])
 	attachments = get_attachments("Donation", name)
 
 	activities.sort(key=lambda x: x["creation"], reverse=True)
@@ -646,10 +468,9 @@ def get_donation_activities(name):
 def get_campaign_activities(name):
 	get_docinfo("", "Campaign", name)
 	docinfo = frappe.response["docinfo"]
-	campaign_meta = frappe.get_meta("Campaign")
-	campaign_fields = {
-		field.fieldname: {"label": field.label, "options": field.options} for field in campaign_meta.fields
-	}
+	timeline_attachments = get_timeline_attachments(
+		docinfo.comments, docinfo.communications + docinfo.automated_messages
+	)
 	avoid_fields = []
 
 	doc = frappe.db.get_values("Campaign", name, ["creation", "owner"])[0]
@@ -663,53 +484,8 @@ def get_campaign_activities(name):
 		}
 	]
 
-	docinfo.versions.reverse()
-
-	for version in docinfo.versions:
-		version_data = json.loads(version.data)
-		if not version_data.get("changed"):
-			continue
-
-		if change := version_data.get("changed")[0]:
-			field = campaign_fields.get(change[0], None)
-			if not field or change[0] in avoid_fields or (not change[1] and not change[2]):
-				continue
-
-			field_label = field.get("label") or change[0]
-			field_option = field.get("options") or None
-
-			activity_type = "changed"	
-			field_data = {
-				"field": change[0],
-				"field_label": field_label,
-				"old_value": change[1],
-				"value": change[2],
-			}
-
-			if not change[1] and change[2]:
-				activity_type = "added"
-				field_data = {
-					"field": change[0],
-					"field_label": field_label,
-					"value": change[2],
-				}
-			elif change[1] and not change[2]:
-				activity_type = "removed"
-				field_data = {
-					"field": change[0],
-					"field_label": field_label,
-					"value": change[1],
-				}
-
-		activity = {
-			"activity_type": activity_type,
-			"creation": version.creation,
-			"owner": version.owner,
-			"data": field_data,
-			"is_lead": False,
-			"options": field_option,
-		}
-		activities.append(activity)
+	for activity in get_version_activities("Campaign", name, avoid_fields):
+		activities.append({**activity, "is_lead": False})
 
 	for comment in docinfo.comments:
 		activity = {
@@ -718,7 +494,7 @@ def get_campaign_activities(name):
 			"creation": comment.creation,
 			"owner": comment.owner,
 			"content": comment.content,
-			"attachments": get_attachments("Comment", comment.name),
+			"attachments": timeline_attachments.get(("Comment", comment.name), []),
 			"is_lead": False,
 		}
 		activities.append(activity)
@@ -737,7 +513,7 @@ def get_campaign_activities(name):
 				"recipients": communication.recipients,
 				"cc": communication.cc,
 				"bcc": communication.bcc,
-				"attachments": get_attachments("Communication", communication.name),
+				"attachments": timeline_attachments.get(("Communication", communication.name), []),
 				"read_by_recipient": communication.read_by_recipient,
 				"delivery_status": communication.delivery_status,
 			},
@@ -756,9 +532,10 @@ def get_campaign_activities(name):
 		}
 		activities.append(activity)
 
-	calls = get_linked_calls(name).get("calls", [])
-	notes = get_linked_notes(name) + get_linked_calls(name).get("notes", [])
-	tasks = get_linked_tasks(name) + get_linked_calls(name).get("tasks", [])
+	linked_calls = get_linked_calls(name)
+	calls = linked_calls.get("calls", [])
+	notes = get_linked_notes(name) + linked_calls.get("notes", [])
+	tasks = get_linked_tasks(name) + linked_calls.get("tasks", [])
 	attachments = get_attachments("Campaign", name)
 
 	activities.sort(key=lambda x: x["creation"], reverse=True)
@@ -805,6 +582,7 @@ def get_communication_activities(name):
 	try:
 		get_docinfo("", "Communication", name)
 		docinfo = frappe.response.get("docinfo", {})
+		timeline_attachments = get_timeline_attachments(docinfo.get("comments", []), [])
 		for comment in docinfo.get("comments", []):
 			notes.append({
 				"name": comment.name,
@@ -812,7 +590,7 @@ def get_communication_activities(name):
 				"creation": comment.creation,
 				"owner": comment.owner,
 				"content": comment.content,
-				"attachments": get_attachments("Comment", comment.name),
+				"attachments": timeline_attachments.get(("Comment", comment.name), []),
 			})
 		for attachment_log in docinfo.get("attachment_logs", []):
 			attachments.append({
@@ -829,27 +607,55 @@ def get_communication_activities(name):
 	activities = handle_multiple_versions(activities)
 	return activities, calls, notes, tasks, attachments
 
+ATTACHMENT_FIELDS = [
+	"name",
+	"file_name",
+	"file_type",
+	"file_url",
+	"file_size",
+	"is_private",
+	"modified",
+	"creation",
+	"owner",
+]
+
+
 def get_attachments(doctype, name):
 	return (
 		frappe.db.get_all(
 			"File",
 			filters={"attached_to_doctype": doctype, "attached_to_name": name},
-			fields=[
-				"name",
-				"file_name",
-				"file_type",
-				"file_url",
-				"file_size",
-				"is_private",
-				"modified",
-				"creation",
-				"owner",
-			],
+			fields=ATTACHMENT_FIELDS,
 		)
 		or []
 	)
 
 
+def get_timeline_attachments(comments, communications):
+	"""
+	Attachments of all the given comments and communications, fetched with a single query.
+	Returns a dict keyed by (attached_to_doctype, attached_to_name).
+	"""
+	names = [d.name for d in comments] + [d.name for d in communications]
+	if not names:
+		return {}
+
+	files = frappe.db.get_all(
+		"File",
+		filters={
+			"attached_to_doctype": ("in", ["Comment", "Communication"]),
+			"attached_to_name": ("in", names),
+		},
+		fields=[*ATTACHMENT_FIELDS, "attached_to_doctype", "attached_to_name"],
+	)
+
+	attachments = {}
+	for file in files:
+		key = (file.pop("attached_to_doctype"), file.pop("attached_to_name"))
+		attachments.setdefault(key, []).append(file)
+	return attachments
+
+
 def handle_multiple_versions(versions):
 	activities = []
 	grouped_versions = []
@@ -976,7 +782,7 @@ def get_linked_calls(name):
 			],
 		)
 
-	calls = [parse_call_log(call) for call in calls] if calls else []
+	calls = parse_call_logs(calls) if calls else []
 
 	return {"calls": calls, "notes": notes, "tasks": tasks}
 
@@ -1035,10 +841,9 @@ def parse_attachment_log(html, type):
 def get_email_template_activities(name):
 	get_docinfo("", "Email Template", name)
 	docinfo = frappe.response["docinfo"]
-	email_template_meta = frappe.get_meta("Email Template")
-	email_template_fields = {
-		field.fieldname: {"label": field.label, "options": field.options} for field in email_template_meta.fields
-	}
+	timeline_attachments = get_timeline_attachments(
+		docinfo.comments, docinfo.communications + docinfo.automated_messages
+	)
 	avoid_fields = []
 
 	doc = frappe.db.get_values("Email Template", name, ["creation", "owner"])[0]
@@ -1052,53 +857,8 @@ def get_email_template_activities(name):
 		}
 	]
 
-	docinfo.versions.reverse()
-
-	for version in docinfo.versions:
-		version_data = json.loads(version.data)
-		if not version_data.get("changed"):
-			continue
-
-		if change := version_data.get("changed")[0]:
-			field = email_template_fields.get(change[0], None)
-			if not field or change[0] in avoid_fields or (not change[1] and not change[2]):
-				continue
-
-			field_label = field.get("label") or change[0]
-			field_option = field.get("options") or None
-
-			activity_type = "changed"	
-			field_data = {
-				"field": change[0],
-				"field_label": field_label,
-				"old_value": change[1],
-				"value": change[2],
-			}
-
-			if not change[1] and change[2]:
-				activity_type = "added"
-				field_data = {
-					"field": change[0],
-					"field_label": field_label,
-					"value": change[2],
-				}
-			elif change[1] and not change[2]:
-				activity_type = "removed"
-				field_data = {
-					"field": change[0],
-					"field_label": field_label,
-					"value": change[1],
-				}
-
-		activity = {
-			"activity_type": activity_type,
-			"creation": version.creation,
-			"owner": version.owner,
-			"data": field_data,
-			"is_lead": False,
-			"options": field_option,
-		}
-		activities.append(activity)
+	for activity in get_version_activities("Email Template", name, avoid_fields):
+		activities.append({**activity, "is_lead": False})
 
 	for comment in docinfo.comments:
 		activity = {
@@ -1107,7 +867,7 @@ def get_email_template_activities(name):
 			"creation": comment.creation,
 			"owner": comment.owner,
 			"content": comment.content,
-			"attachments": get_attachments("Comment", comment.name),
+			"attachments": timeline_attachments.get(("Comment", comment.name), []),
 			"is_lead": False,
 		}
 		activities.append(activity)
@@ -1126,7 +886,7 @@ def get_email_template_activities(name):
 				"recipients": communication.recipients,
 				"cc": communication.cc,
 				"bcc": communication.bcc,
-				"attachments": get_attachments("Communication", communication.name),
+				"attachments": timeline_attachments.get(("Communication", communication.name), []),
 				"read_by_recipient": communication.read_recipient,
 				"delivery_status": communication.delivery_status,
 			},
@@ -1145,12 +905,348 @@ def get_email_template_activities(name):
 		}
 		activities.append(activity)
 
-	calls = get_linked_calls(name).get("calls", [])
-	notes = get_linked_notes(name) + get_linked_calls(name).get("notes", [])
-	tasks = get_linked_tasks(name) + get_linked_calls(name).get("tasks", [])
+	linked_calls = get_linked_calls(name)
+	calls = linked_calls.get("calls", [])
+	notes = get_linked_notes(name) + linked_calls.get("notes", [])
+	tasks = get_linked_tasks(name) + linked_calls.get("tasks", [])
 	attachments = get_attachments("Email Template", name)
 
 	activities.sort(key=lambda x: x["creation"], reverse=True)
 	activities = handle_multiple_versions(activities)
 
 	return activities, calls, notes, tasks, attachments
+
+
+TIMELINE_AVOID_FIELDS = {
+	"CRM Deal": ["lead", "response_by", "sla_creation", "sla", "first_response_time", "first_responded_on"],
+	"CRM Lead": ["converted", "response_by", "sla_creation", "sla", "first_response_time", "first_responded_on"],
+	"Donor": ["converted", "response_by", "sla_creation", "sla", "first_response_time", "first_responded_on"],
+}
+
+VERSION_CACHE_TTL = 7 * 24 * 60 * 60
+
+FEED_SOURCES = ["creation", "version", "comment", "communication", "call", "note", "task"]
+
+
+@frappe.whitelist()
+def get_activity_feed(doctype, name, page_length=20, cursor=None):
+	"""
+	Return one page of the record's timeline, newest first, with a `next_cursor` for the page
+	after it. Every source (versions, comments, communications, calls, notes, tasks) is read
+	lazily in creation order and the sources are merged, so a page reads about `page_length`
+	rows per source whatever the size of the history.
+	"""
+	frappe.has_permission(doctype, "read", name, throw=True)
+	page_length = cint(page_length) or 20
+	after = decode_cursor(cursor, 3) if cursor else None
+
+	targets = [(doctype, name)]
+	if doctype == "CRM Deal" and (lead := frappe.db.get_value("CRM Deal", name, "lead")):
+		targets.append(("CRM Lead", lead))
+
+	streams = []
+	for ref_doctype, ref_name in targets:
+		for source in FEED_SOURCES:
+			rank = len(streams)
+			streams.append(iter_feed_source(source, rank, ref_doctype, ref_name, doctype, after, page_length))
+
+	page = list(islice(heapq.merge(*streams, key=lambda a: a["_feed_key"], reverse=True), page_length + 1))
+
+	next_cursor = None
+	if len(page) > page_length:
+		page = page[:page_length]
+		creation, rank, item_name = page[-1]["_feed_key"]
+		next_cursor = encode_cursor([creation, rank, item_name])
+
+	timeline_attachments = get_timeline_attachments(
+		[frappe._dict(name=a["name"]) for a in page if a["activity_type"] == "comment"],
+		[frappe._dict(name=a["name"]) for a in page if a["activity_type"] == "communication"],
+	)
+	for activity in page:
+		activity.pop("_feed_key")
+		if activity["activity_type"] == "comment":
+			activity["attachments"] = timeline_attachments.get(("Comment", activity["name"]), [])
+		elif activity["activity_type"] == "communication":
+			activity["data"]["attachments"] = timeline_attachments.get(
+				("Communication", activity["name"]), []
+			)
+
+	return {"activities": handle_multiple_versions(page), "next_cursor": next_cursor}
+
+
+def iter_feed_source(source, rank, ref_doctype, ref_name, doctype, after, batch_size):
+	"""
+	Yield the activities of one source newest first, reading `batch_size` rows at a time.
+	`after` is the (creation, rank, name) of the last activity already sent.
+	"""
+	is_lead = ref_doctype == "CRM Lead" and doctype != "CRM Lead"
+	if source == "creation":
+		yield from iter_creation_activity(rank, ref_doctype, ref_name, doctype, after)
+		return
+
+	if source == "version":
+		yield from iter_version_activities(rank, ref_doctype, ref_name, doctype, after)
+		return
+
+	table, fields, conditions = get_feed_source_query(source, ref_doctype, ref_name)
+	last = None
+	if after:
+		last = (after[0], after[2] if rank == after[1] else None, "<=" if rank < after[1] else "<")
+
+	while True:
+		query = frappe.qb.from_(table).select(*[table[f] for f in fields]).where(Criterion.all(conditions))
+		if last:
+			creation, item_name, operator = last
+			if item_name is not None:
+				query = query.where(
+					(table.creation < creation) | ((table.creation == creation) & (table.name < item_name))
+				)
+			elif operator == "<=":
+				query = query.where(table.creation <= creation)
+			else:
+				query = query.where(table.creation < creation)
+
+		rows = query.orderby(table.creation, order=Order.desc).orderby(table.name, order=Order.desc)
+		rows = rows.limit(batch_size).run(as_dict=True)
+		if source == "call":
+			rows = parse_call_logs(rows)
+
+		for row in rows:
+			activity = get_feed_activity(source, row)
+			activity["is_lead"] = is_lead
+			activity["_feed_key"] = (row.creation, rank, row.name)
+			yield activity
+
+		if len(rows) < batch_size:
+			return
+		last = (rows[-1].creation, rows[-1].name, "<")
+
+
+def iter_version_activities(rank, ref_doctype, ref_name, doctype, after):
+	is_lead = ref_doctype == "CRM Lead" and doctype != "CRM Lead"
+	activities = get_version_activities(ref_doctype, ref_name, TIMELINE_AVOID_FIELDS.get(ref_doctype, []))
+	for activity in reversed(activities):
+		key = (activity["creation"], rank, activity["name"])
+		if after and (str(key[0]), rank, key[2]) >= (after[0], after[1], after[2]):
+			continue
+		yield {**activity, "is_lead": is_lead, "_feed_key": key}
+
+
+def iter_creation_activity(rank, ref_doctype, ref_name, doctype, after):
+	creation, owner = frappe.db.get_value(ref_doctype, ref_name, ["creation", "owner"])
+	key = (creation, rank, ref_name)
+	if after and (str(creation), rank, ref_name) >= (after[0], after[1], after[2]):
+		return
+
+	text = f"created this {ref_doctype.replace('CRM ', '').lower()}"
+	if ref_doctype == "CRM Deal" and frappe.db.get_value("CRM Deal", ref_name, "lead"):
+		text = "converted the lead to this deal"
+
+	yield {
+		"name": ref_name,
+		"activity_type": "creation",
+		"creation": creation,
+		"owner": owner,
+		"data": text,
+		"is_lead": ref_doctype == "CRM Lead" and doctype != "CRM Lead",
+		"_feed_key": key,
+	}
+
+
+def get_feed_source_query(source, ref_doctype, ref_name):
+	"""Return (table, fields, conditions) selecting the rows of a feed source."""
+	if source == "comment":
+		table = frappe.qb.DocType("Comment")
+		return (
+			table,
+			["name", "creation", "owner", "content", "comment_type"],
+			[
+				table.reference_doctype == ref_doctype,
+				table.reference_name == ref_name,
+				table.comment_type.isin(["Comment", "Attachment", "Attachment Removed"]),
+			],
+		)
+
+	if source == "communication":
+		table = frappe.qb.DocType("Communication")
+		return (
+			table,
+			[
+				"name",
+				"creation",
+				"communication_type",
+				"communication_date",
+				"subject",
+				"content",
+				"sender_full_name",
+				"sender",
+				"recipients",
+				"cc",
+				"bcc",
+				"read_by_recipient",
+				"delivery_status",
+			],
+			[
+				table.reference_doctype == ref_doctype,
+				table.reference_name == ref_name,
+				table.communication_type.isin(["Communication", "Automated Message"]),
+			],
+		)
+
+	fields = {
+		"call": (
+			"CRM Call Log",
+			["name", "caller", "receiver", "from", "to", "duration", "start_time", "end_time"]
+			+ ["status", "type", "recording_url", "creation", "note"],
+		),
+		"note": ("FCRM Note", ["name", "title", "content", "owner", "creation", "modified"]),
+		"task": (
+			"CRM Task",
+			["name", "title", "description", "assigned_to", "due_date", "priority", "status"]
+			+ ["creation", "modified"],
+		),
+	}
+	table_name, source_fields = fields[source]
+	table = frappe.qb.DocType(table_name)
+	return (
+		table,
+		source_fields,
+		[table.reference_doctype == ref_doctype, table.reference_docname == ref_name],
+	)
+
+
+def get_feed_activity(source, row):
+	if source == "comment":
+		if row.comment_type != "Comment":
+			return {
+				"name": row.name,
+				"activity_type": "attachment_log",
+				"creation": row.creation,
+				"owner": row.owner,
+				"data": parse_attachment_log(row.content, row.comment_type),
+			}
+		return {
+			"name": row.name,
+			"activity_type": "comment",
+			"creation": row.creation,
+			"owner": row.owner,
+			"content": row.content,
+		}
+
+	if source == "communication":
+		return {
+			"name": row.name,
+			"activity_type": "communication",
+			"communication_type": row.communication_type,
+			"communication_date": row.communication_date or row.creation,
+			"creation": row.creation,
+			"data": {
+				"subject": row.subject,
+				"content": row.content,
+				"sender_full_name": row.sender_full_name,
+				"sender": row.sender,
+				"recipients": row.recipients,
+				"cc": row.cc,
+				"bcc": row.bcc,
+				"read_by_recipient": row.read_by_recipient,
+				"delivery_status": row.delivery_status,
+			},
+		}
+
+	return {
+		"name": row.get("name"),
+		"activity_type": source,
+		"creation": row.get("creation"),
+		"owner": row.get("owner") or row.get("caller"),
+		"data": row,
+	}
+
+
+def get_version_activity(version, fields_meta, avoid_fields):
+	"""Turn a Version row into a changed/added/removed activity, or None if it is not shown."""
+	data = json.loads(version.data)
+	if not data.get("changed"):
+		return None
+
+	change = data.get("changed")[0]
+	field = fields_meta.get(change[0], None)
+	if not field or change[0] in avoid_fields or (not change[1] and not change[2]):
+		return None
+
+	field_label = field.get("label") or change[0]
+
+	activity_type = "changed"
+	data = {
+		"field": change[0],
+		"field_label": field_label,
+		"old_value": change[1],
+		"value": change[2],
+	}
+
+	if not change[1] and change[2]:
+		activity_type = "added"
+		data = {"field": change[0], "field_label": field_label, "value": change[2]}
+	elif change[1] and not change[2]:
+		activity_type = "removed"
+		data = {"field": change[0], "field_label": field_label, "value": change[1]}
+
+	return {
+		"name": version.name,
+		"activity_type": activity_type,
+		"creation": version.creation,
+		"owner": version.owner,
+		"data": data,
+		"options": field.get("options") or None,
+	}
+
+
+def get_version_activities(doctype, name, avoid_fields=None):
+	"""
+	Parsed version activities of a document, oldest first.
+
+	The parsed list is kept in the cache per document and only the Version rows added since the
+	last call are parsed; it is dropped when the doctype's fields change (see `clear_version_cache`).
+	"""
+	cache_key = f"crm_version_activities:{doctype}:{name}"
+	meta_version = frappe.cache.get_value(f"crm_version_meta:{doctype}") or ""
+	cached = frappe.cache.get_value(cache_key)
+	if not cached or cached["meta_version"] != meta_version:
+		cached = {"meta_version": meta_version, "last_version": None, "activities": []}
+
+	Version = frappe.qb.DocType("Version")
+	query = (
+		frappe.qb.from_(Version)
+		.select(Version.name, Version.creation, Version.owner, Version.data)
+		.where((Version.ref_doctype == doctype) & (Version.docname == name))
+		.orderby(Version.creation)
+		.orderby(Version.name)
+	)
+	if cached["last_version"]:
+		creation, version_name = cached["last_version"]
+		query = query.where(
+			(Version.creation > creation) | ((Version.creation == creation) & (Version.name > version_name))
+		)
+
+	new_versions = query.run(as_dict=True)
+	if not new_versions and cached["last_version"]:
+		return cached["activities"]
+
+	if new_versions:
+		fields_meta = {
+			field.fieldname: {"label": field.label, "options": field.options}
+			for field in frappe.get_meta(doctype).fields
+		}
+		for version in new_versions:
+			if activity := get_version_activity(version, fields_meta, avoid_fields or []):
+				cached["activities"].append(activity)
+		cached["last_version"] = (new_versions[-1].creation, new_versions[-1].name)
+
+	frappe.cache.set_value(cache_key, cached, expires_in_sec=VERSION_CACHE_TTL)
+	return cached["activities"]
+
+
+def clear_version_cache(doc, method=None):
+	"""Doc event for DocType, Custom Field & Property Setter: re-parse version activities of the doctype."""
+	doctype = {"Custom Field": doc.get("dt"), "Property Setter": doc.get("doc_type")}.get(doc.doctype, doc.name)
+	if doctype:
+		frappe.cache.set_value(f"crm_version_meta:{doctype}", frappe.generate_hash(length=8))
@@ -1,11 +1,18 @@
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 import frappe
 from frappe import _
+from frappe.utils.caching import request_cache
 
 from crm.fcrm.doctype.crm_dashboard.crm_dashboard import create_default_manager_dashboard
 from crm.utils import sales_user_only
 
+# widgets are cached briefly so reloads and filter toggles don't re-run every query
+WIDGET_CACHE_TTL = 60
+DASHBOARD_WORKERS = 4
+
 
 @frappe.whitelist()
 def reset_to_default():
@@ -39,13 +46,7 @@ def get_dashboard(from_date="", to_date="", user=""):
 	else:
 		layout = json.loads(frappe.db.get_value("CRM Dashboard", "Manager Dashboard", "layout") or "[]")
 
-	for l in layout:
-		method_name = f"get_{l['name']}"
-		if hasattr(frappe.get_attr("crm.api.dashboard"), method_name):
-			method = getattr(frappe.get_attr("crm.api.dashboard"), method_name)
-			l["data"] = method(from_date, to_date, user)
-		else:
-			l["data"] = None
+	evaluate_widgets(layout, str(from_date), str(to_date), user)
 
 	return layout
 
@@ -65,17 +66,121 @@ def get_chart(name, type, from_date="", to_date="", user=""):
 	if is_sales_user and not user:
 		user = frappe.session.user
 
-	method_name = f"get_{name}"
-	if hasattr(frappe.get_attr("crm.api.dashboard"), method_name):
-		method = getattr(frappe.get_attr("crm.api.dashboard"), method_name)
-		return method(from_date, to_date, user)
+	if hasattr(frappe.get_attr("crm.api.dashboard"), f"get_{name}"):
+		return get_widget_data(name, str(from_date), str(to_date), user)[0]
 	else:
 		return {"error": _("Invalid chart name")}
 
 
-def get_total_leads(from_date, to_date, user=""):
+def evaluate_widgets(layout, from_date, to_date, user):
 	"""
-	Get lead count for the dashboard.
+	Set `data`, `timing` (ms) and `cached` on each layout entry. Widgets missing from the cache
+	are evaluated in parallel, each on its own database connection.
+	"""
+	pending = []
+	for l in layout:
+		cached = frappe.cache.get_value(get_widget_cache_key(l["name"], from_date, to_date, user))
+		if cached is not None:
+			l.update(data=cached, timing=0, cached=True)
+		elif hasattr(frappe.get_attr("crm.api.dashboard"), f"get_{l['name']}"):
+			pending.append(l)
+		else:
+			l["data"] = None
+
+	# the deal number cards share one metrics scan, which is memoized per request, so they
+	# stay together on this thread while the other widgets go to the pool
+	shared = [l for l in pending if l["name"] in DEAL_METRIC_WIDGETS]
+	parallel = [l for l in pending if l["name"] not in DEAL_METRIC_WIDGETS]
+
+	if len(parallel) < 2 or frappe.flags.in_test:
+		# tests run inside an uncommitted transaction, other connections can't see their data
+		results = [run_widget(l["name"], from_date, to_date, user) for l in shared + parallel]
+	else:
+		args = (frappe.local.site, frappe.local.sites_path, frappe.session.user, frappe.local.lang)
+		with ThreadPoolExecutor(max_workers=min(DASHBOARD_WORKERS, len(parallel))) as executor:
+			futures = [
+				executor.submit(run_widget_in_thread, *args, l["name"], from_date, to_date, user)
+				for l in parallel
+			]
+			results = [run_widget(l["name"], from_date, to_date, user) for l in shared]
+			results += [future.result() for future in futures]
+	pending = shared + parallel
+
+	for l, (data, timing) in zip(pending, results, strict=True):
+		frappe.cache.set_value(
+			get_widget_cache_key(l["name"], from_date, to_date, user),
+			data,
+			expires_in_sec=WIDGET_CACHE_TTL,
+		)
+		l.update(data=data, timing=timing, cached=False)
+
+
+def get_widget_data(name, from_date, to_date, user):
+	"""Return (data, timing in ms) of a single widget, from the cache when possible."""
+	cache_key = get_widget_cache_key(name, from_date, to_date, user)
+	if (cached := frappe.cache.get_value(cache_key)) is not None:
+		return cached, 0
+
+	data, timing = run_widget(name, from_date, to_date, user)
+	frappe.cache.set_value(cache_key, data, expires_in_sec=WIDGET_CACHE_TTL)
+	return data, timing
+
+
+def run_widget(name, from_date, to_date, user):
+	method = getattr(frappe.get_attr("crm.api.dashboard"), f"get_{name}")
+	start = time.monotonic()
+	data = method(from_date, to_date, user)
+	return data, round((time.monotonic() - start) * 1000, 2)
+
+
+def run_widget_in_thread(site, sites_path, session_user, lang, name, from_date, to_date, user):
+	frappe.init(site=site, sites_path=sites_path)
+	try:
+		frappe.connect()
+		frappe.set_user(session_user)
+		frappe.local.lang = lang
+		return run_widget(name, from_date, to_date, user)
+	finally:
+		frappe.destroy()
+
+
+def get_widget_cache_key(name, from_date, to_date, user):
+	return f"crm_dashboard_widget:{name}:{from_date}:{to_date}:{user}:{frappe.local.lang}"
+
+
+DEAL_METRIC_WIDGETS = {
+	"ongoing_deals",
+	"average_ongoing_deal_value",
+	"won_deals",
+	"average_won_deal_value",
+	"average_deal_value",
+	"average_time_to_close_a_lead",
+	"average_time_to_close_a_deal",
+}
+
+# metric: (date basis, status type condition, rollup measure)
+DEAL_METRICS = {
+	"ongoing_count": ("Created", "s.type NOT IN ('Won', 'Lost')", "record_count"),
+	"ongoing_value": ("Created", "s.type NOT IN ('Won', 'Lost')", "deal_value"),
+	"active_count": ("Created", "s.type != 'Lost'", "record_count"),
+	"active_value": ("Created", "s.type != 'Lost'", "deal_value"),
+	"won_count": ("Closed", "s.type = 'Won'", "record_count"),
+	"won_value": ("Closed", "s.type = 'Won'", "deal_value"),
+	"won_days_to_close": ("Closed", "s.type = 'Won'", "days_to_close"),
+	"won_lead_days_to_close": ("Closed", "s.type = 'Won'", "lead_days_to_close"),
+}
+
+
+@request_cache
+def get_deal_metrics(from_date, to_date, user=""):
+	"""
+	Compute every deal number card metric for the current and the previous period in a single
+	scan of the rollup.
+	Returns:
+	{
+		"current": {"ongoing_count": 12, "ongoing_value": 34000, "won_count": 4, ...},
+		"prev": {...},
+	}
 	"""
 	conds = ""
 
@@ -84,53 +189,55 @@ def get_total_leads(from_date, to_date, user=""):
 		diff = 1
 
 	if user:
-		conds += f" AND lead_owner = '{user}'"
+		conds += " AND r.record_owner = %(user)s"
+
+	periods = {
+		"current": "r.date >= %(from_date)s AND r.date <= %(to_date)s",
+		"prev": "r.date >= %(prev_from_date)s AND r.date < %(from_date)s",
+	}
+	columns = [
+		f"SUM(CASE WHEN {period} AND r.date_basis = '{basis}' AND {status} THEN r.{measure} END)"
+		f" AS {period_name}_{metric}"
+		for period_name, period in periods.items()
+		for metric, (basis, status, measure) in DEAL_METRICS.items()
+	]
 
 	result = frappe.db.sql(
 		f"""
 		SELECT
-            COUNT(CASE
-                WHEN creation >= %(from_date)s AND creation < DATE_ADD(%(to_date)s, INTERVAL 1 DAY)
-                {conds}
-                THEN name
-                ELSE NULL
-            END) as current_month_leads,
-
-            COUNT(CASE
-                WHEN creation >= %(prev_from_date)s AND creation < %(from_date)s
-                {conds}
-                THEN name
-                ELSE NULL
-            END) as prev_month_leads
-		FROM `tabCRM Lead`
-    """,
+			{", ".join(columns)}
+		FROM `tabCRM Dashboard Rollup` r
+		JOIN `tabCRM Deal Status` s ON r.status = s.name
+		WHERE r.date_basis IN ('Created', 'Closed') AND r.reference_doctype = 'CRM Deal'
+			AND r.date >= %(prev_from_date)s AND r.date <= %(to_date)s
+			{conds}
+		""",
 		{
 			"from_date": from_date,
 			"to_date": to_date,
 			"prev_from_date": frappe.utils.add_days(from_date, -diff),
+			"user": user,
 		},
 		as_dict=1,
-	)
-
-	current_month_leads = result[0].current_month_leads or 0
-	prev_month_leads = result[0].prev_month_leads or 0
+	)[0]
 
-	delta_in_percentage = (
-		(current_month_leads - prev_month_leads) / prev_month_leads * 100 if prev_month_leads else 0
+	return frappe._dict(
+		{
+			period_name: frappe._dict(
+				{metric: result.get(f"{period_name}_{metric}") or 0 for metric in DEAL_METRICS}
+			)
+			for period_name in periods
+		}
 	)
 
-	return {
-		"title": _("Total leads"),
-		"tooltip": _("Total number of leads"),
-		"value": current_month_leads,
-		"delta": delta_in_percentage,
-		"deltaSuffix": "%",
-	}
 
+def get_average(total, count):
+	return total / count if count else 0
 
-def get_ongoing_deals(from_date, to_date, user=""):
+
+def get_total_leads(from_date, to_date, user=""):
 	"""
-	Get ongoing deal count for the dashboard, and also calculate average deal value for ongoing deals.
+	Get lead count for the dashboard.
 	"""
 	conds = ""
 
@@ -139,39 +246,60 @@ def get_ongoing_deals(from_date, to_date, user=""):
 		diff = 1
 
 	if user:
-		conds += f" AND d.deal_owner = '{user}'"
+		conds += " AND r.record_owner = %(user)s"
 
 	result = frappe.db.sql(
 		f"""
 		SELECT
-			COUNT(CASE
-				WHEN d.creation >= %(from_date)s AND d.creation < DATE_ADD(%(to_date)s, INTERVAL 1 DAY)
-					AND s.type NOT IN ('Won', 'Lost')
-					{conds}
-				THEN d.name
-				ELSE NULL
-			END) as current_month_deals,
-
-			COUNT(CASE
-				WHEN d.creation >= %(prev_from_date)s AND d.creation < %(from_date)s
-					AND s.type NOT IN ('Won', 'Lost')
-					{conds}
-				THEN d.name
-				ELSE NULL
-			END) as prev_month_deals
-		FROM `tabCRM Deal` d
-		JOIN `tabCRM Deal Status` s ON d.status = s.name
+			SUM(CASE
+				WHEN r.date >= %(from_date)s AND r.date <= %(to_date)s
+				THEN r.record_count
+				ELSE 0
+			END) as current_month_leads,
+
+			SUM(CASE
+				WHEN r.date >= %(prev_from_date)s AND r.date < %(from_date)s
+				THEN r.record_count
+				ELSE 0
+			END) as prev_month_leads
+		FROM `tabCRM Dashboard Rollup` r
+		WHERE r.date_basis = 'Created' AND r.reference_doctype = 'CRM Lead'
+			AND r.date >= %(prev_from_date)s AND r.date <= %(to_date)s
+			{conds}
 	""",
 		{
 			"from_date": from_date,
 			"to_date": to_date,
 			"prev_from_date": frappe.utils.add_days(from_date, -diff),
+			"user": user,
 		},
 		as_dict=1,
 	)
 
-	current_month_deals = result[0].current_month_deals or 0
-	prev_month_deals = result[0].prev_month_deals or 0
+	current_month_leads = result[0].current_month_leads or 0
+	prev_month_leads = result[0].prev_month_leads or 0
+
+	delta_in_percentage = (
+		(current_month_leads - prev_month_leads) / prev_month_leads * 100 if prev_month_leads else 0
+	)
+
+	return {
+		"title": _("Total leads"),
+		"tooltip": _("Total number of leads"),
+		"value": current_month_leads,
+		"delta": delta_in_percentage,
+		"deltaSuffix": "%",
+	}
+
+
+def get_ongoing_deals(from_date, to_date, user=""):
+	"""
+	Get ongoing deal count for the dashboard, and also calculate average deal value for ongoing deals.
+	"""
+	metrics = get_deal_metrics(from_date, to_date, user)
+
+	current_month_deals = metrics.current.ongoing_count
+	prev_month_deals = metrics.prev.ongoing_count
 
 	delta_in_percentage = (
 		(current_month_deals - prev_month_deals) / prev_month_deals * 100 if prev_month_deals else 0
@@ -190,46 +318,10 @@ def get_average_ongoing_deal_value(from_date, to_date, user=""):
 	"""
 	Get ongoing deal count for the dashboard, and also calculate average deal value for ongoing deals.
 	"""
-	conds = ""
-
-	diff = frappe.utils.date_diff(to_date, from_date)
-	if diff == 0:
-		diff = 1
-
-	if user:
-		conds += f" AND d.deal_owner = '{user}'"
-
-	result = frappe.db.sql(
-		f"""
-		SELECT
-			AVG(CASE
-				WHEN d.creation >= %(from_date)s AND d.creation < DATE_ADD(%(to_date)s, INTERVAL 1 DAY)
-					AND s.type NOT IN ('Won', 'Lost')
-					{conds}
-				THEN d.deal_value * IFNULL(d.exchange_rate, 1)
-				ELSE NULL
-			END) as current_month_avg_value,
-
-			AVG(CASE
-				WHEN d.creation >= %(prev_from_date)s AND d.creation < %(from_date)s
-					AND s.type NOT IN ('Won', 'Lost')
-					{conds}
-				THEN d.deal_value * IFNULL(d.exchange_rate, 1)
-				ELSE NULL
-			END) as prev_month_avg_value
-		FROM `tabCRM Deal` d
-		JOIN `tabCRM Deal Status` s ON d.status = s.name
-    """,
-		{
-			"from_date": from_date,
-			"to_date": to_date,
-			"prev_from_date": frappe.utils.add_days(from_date, -diff),
-		},
-		as_dict=1,
-	)
+	metrics = get_deal_metrics(from_date, to_date, user)
 
-	current_month_avg_value = result[0].current_month_avg_value or 0
-	prev_month_avg_value = result[0].prev_month_avg_value or 0
+	current_month_avg_value = get_average(metrics.current.ongoing_value, metrics.current.ongoing_count)
+	prev_month_avg_value = get_average(metrics.prev.ongoing_value, metrics.prev.ongoing_count)
 
 	avg_value_delta = current_month_avg_value - prev_month_avg_value if prev_month_avg_value else 0
 
@@ -246,47 +338,10 @@ def get_won_deals(from_date, to_date, user=""):
 	"""
 	Get won deal count for the dashboard, and also calculate average deal value for won deals.
 	"""
+	metrics = get_deal_metrics(from_date, to_date, user)
 
-	diff = frappe.utils.date_diff(to_date, from_date)
-	if diff == 0:
-		diff = 1
-
-	conds = ""
-
-	if user:
-		conds += f" AND d.deal_owner = '{user}'"
-
-	result = frappe.db.sql(
-		f"""
-		SELECT
-			COUNT(CASE
-				WHEN d.closed_date >= %(from_date)s AND d.closed_date < DATE_ADD(%(to_date)s, INTERVAL 1 DAY)
-					AND s.type = 'Won'
-					{conds}
-				THEN d.name
-				ELSE NULL
-			END) as current_month_deals,
-
-			COUNT(CASE
-				WHEN d.closed_date >= %(prev_from_date)s AND d.closed_date < %(from_date)s
-					AND s.type = 'Won'
-					{conds}
-				THEN d.name
-				ELSE NULL
-			END) as prev_month_deals
-		FROM `tabCRM Deal` d
-		JOIN `tabCRM Deal Status` s ON d.status = s.name
-		""",
-		{
-			"from_date": from_date,
-			"to_date": to_date,
-			"prev_from_date": frappe.utils.add_days(from_date, -diff),
-		},
-		as_dict=1,
-	)
-
-	current_month_deals = result[0].current_month_deals or 0
-	prev_month_deals = result[0].prev_month_deals or 0
+	current_month_deals = metrics.current.won_count
+	prev_month_deals = metrics.prev.won_count
 
 	delta_in_percentage = (
 		(current_month_deals - prev_month_deals) / prev_month_deals * 100 if prev_month_deals else 0
@@ -305,47 +360,10 @@ def get_average_won_deal_value(from_date, to_date, user=""):
 	"""
 	Get won deal count for the dashboard, and also calculate average deal value for won deals.
 	"""
+	metrics = get_deal_metrics(from_date, to_date, user)
 
-	diff = frappe.utils.date_diff(to_date, from_date)
-	if diff == 0:
-		diff = 1
-
-	conds = ""
-
-	if user:
-		conds += f" AND d.deal_owner = '{user}'"
-
-	result = frappe.db.sql(
-		f"""
-		SELECT
-			AVG(CASE
-				WHEN d.closed_date >= %(from_date)s AND d.closed_date < DATE_ADD(%(to_date)s, INTERVAL 1 DAY)
-					AND s.type = 'Won'
-					{conds}
-				THEN d.deal_value * IFNULL(d.exchange_rate, 1)
-				ELSE NULL
-			END) as current_month_avg_value,
-
-			AVG(CASE
-				WHEN d.closed_date >= %(prev_from_date)s AND d.closed_date < %(from_date)s
-					AND s.type = 'Won'
-					{conds}
-				THEN d.deal_value * IFNULL(d.exchange_rate, 1)
-				ELSE NULL
-			END) as prev_month_avg_value
-		FROM `tabCRM Deal` d
-		JOIN `tabCRM Deal Status` s ON d.status = s.name
-		""",
-		{
-			"from_date": from_date,
-			"to_date": to_date,
-			"prev_from_date": frappe.utils.add_days(from_date, -diff),
-		},
-		as_dict=1,
-	)
-
-	current_month_avg_value = result[0].current_month_avg_value or 0
-	prev_month_avg_value = result[0].prev_month_avg_value or 0
+	current_month_avg_value = get_average(metrics.current.won_value, metrics.current.won_count)
+	prev_month_avg_value = get_average(metrics.prev.won_value, metrics.prev.won_count)
 
 	avg_value_delta = current_month_avg_value - prev_month_avg_value if prev_month_avg_value else 0
 
@@ -362,47 +380,10 @@ def get_average_deal_value(from_date, to_date, user=""):
 	"""
 	Get average deal value for the dashboard.
 	"""
+	metrics = get_deal_metrics(from_date, to_date, user)
 
-	diff = frappe.utils.date_diff(to_date, from_date)
-	if diff == 0:
-		diff = 1
-
-	conds = ""
-
-	if user:
-		conds += f" AND d.deal_owner = '{user}'"
-
-	result = frappe.db.sql(
-		f"""
-		SELECT
-			AVG(CASE
-				WHEN d.creation >= %(from_date)s AND d.creation < DATE_ADD(%(to_date)s, INTERVAL 1 DAY)
-					AND s.type != 'Lost'
-					{conds}
-				THEN d.deal_value * IFNULL(d.exchange_rate, 1)
-				ELSE NULL
-			END) as current_month_avg,
-
-			AVG(CASE
-				WHEN d.creation >= %(prev_from_date)s AND d.creation < %(from_date)s
-					AND s.type != 'Lost'
-					{conds}
-				THEN d.deal_value * IFNULL(d.exchange_rate, 1)
-				ELSE NULL
-			END) as prev_month_avg
-		FROM `tabCRM Deal` AS d
-		JOIN `tabCRM Deal Status` s ON d.status = s.name
-		""",
-		{
-			"from_date": from_date,
-			"to_date": to_date,
-			"prev_from_date": frappe.utils.add_days(from_date, -diff),
-		},
-		as_dict=1,
-	)
-
-	current_month_avg = result[0].current_month_avg or 0
-	prev_month_avg = result[0].prev_month_avg or 0
+	current_month_avg = get_average(metrics.current.active_value, metrics.current.active_count)
+	prev_month_avg = get_average(metrics.prev.active_value, metrics.prev.active_count)
 
 	delta = current_month_avg - prev_month_avg if prev_month_avg else 0
 
@@ -420,43 +401,10 @@ def get_average_time_to_close_a_lead(from_date, to_date, user=""):
 	"""
 	Get average time to close deals for the dashboard.
 	"""
+	metrics = get_deal_metrics(from_date, to_date, user)
 
-	diff = frappe.utils.date_diff(to_date, from_date)
-	if diff == 0:
-		diff = 1
-
-	conds = ""
-
-	if user:
-		conds += f" AND d.deal_owner = '{user}'"
-
-	prev_from_date = frappe.utils.add_days(from_date, -diff)
-	prev_to_date = from_date
-
-	result = frappe.db.sql(
-		f"""
-		SELECT
-			AVG(CASE WHEN d.closed_date >= %(from_date)s AND d.closed_date < DATE_ADD(%(to_date)s, INTERVAL 1 DAY)
-				THEN TIMESTAMPDIFF(DAY, COALESCE(l.creation, d.creation), d.closed_date) END) as current_avg_lead,
-			AVG(CASE WHEN d.closed_date >= %(prev_from_date)s AND d.closed_date < %(prev_to_date)s
-				THEN TIMESTAMPDIFF(DAY, COALESCE(l.creation, d.creation), d.closed_date) END) as prev_avg_lead
-		FROM `tabCRM Deal` AS d
-		JOIN `tabCRM Deal Status` s ON d.status = s.name
-		LEFT JOIN `tabCRM Lead` l ON d.lead = l.name
-		WHERE d.closed_date IS NOT NULL AND s.type = 'Won'
-			{conds}
-		""",
-		{
-			"from_date": from_date,
-			"to_date": to_date,
-			"prev_from_date": prev_from_date,
-			"prev_to_date": prev_to_date,
-		},
-		as_dict=1,
-	)
-
-	current_avg_lead = result[0].current_avg_lead or 0
-	prev_avg_lead = result[0].prev_avg_lead or 0
+	current_avg_lead = get_average(metrics.current.won_lead_days_to_close, metrics.current.won_count)
+	prev_avg_lead = get_average(metrics.prev.won_lead_days_to_close, metrics.prev.won_count)
 	delta_lead = current_avg_lead - prev_avg_lead if prev_avg_lead else 0
 
 	return {
@@ -474,43 +422,10 @@ def get_average_time_to_close_a_deal(from_date, to_date, user=""):
 	"""
 	Get average time to close deals for the dashboard.
 	"""
+	metrics = get_deal_metrics(from_date, to_date, user)
 
-	diff = frappe.utils.date_diff(to_date, from_date)
-	if diff == 0:
-		diff = 1
-
-	conds = ""
-
-	if user:
-		conds += f" AND d.deal_owner = '{user}'"
-
-	prev_from_date = frappe.utils.add_days(from_date, -diff)
-	prev_to_date = from_date
-
-	result = frappe.db.sql(
-		f"""
-		SELECT
-			AVG(CASE WHEN d.closed_date >= %(from_date)s AND d.closed_date < DATE_ADD(%(to_date)s, INTERVAL 1 DAY)
-				THEN TIMESTAMPDIFF(DAY, d.creation, d.closed_date) END) as current_avg_deal,
-			AVG(CASE WHEN d.closed_date >= %(prev_from_date)s AND d.closed_date < %(prev_to_date)s
-				THEN TIMESTAMPDIFF(DAY, d.creation, d.closed_date) END) as prev_avg_deal
-		FROM `tabCRM Deal` AS d
-		JOIN `tabCRM Deal Status` s ON d.status = s.name
-		LEFT JOIN `tabCRM Lead` l ON d.lead = l.name
-		WHERE d.closed_date IS NOT NULL AND s.type = 'Won'
-			{conds}
-		""",
-		{
-			"from_date": from_date,
-			"to_date": to_date,
-			"prev_from_date": prev_from_date,
-			"prev_to_date": prev_to_date,
-		},
-		as_dict=1,
-	)
-
-	current_avg_deal = result[0].current_avg_deal or 0
-	prev_avg_deal = result[0].prev_avg_deal or 0
+	current_avg_deal = get_average(metrics.current.won_days_to_close, metrics.current.won_count)
+	prev_avg_deal = get_average(metrics.prev.won_days_to_close, metrics.prev.won_count)
 	delta_deal = current_avg_deal - prev_avg_deal if prev_avg_deal else 0
 
 	return {
@@ -534,52 +449,31 @@ def get_sales_trend(from_date="", to_date="", user=""):
 	]
 	"""
 
-	lead_conds = ""
-	deal_conds = ""
+	conds = ""
 
 	if not from_date or not to_date:
 		from_date = frappe.utils.get_first_day(from_date or frappe.utils.nowdate())
 		to_date = frappe.utils.get_last_day(to_date or frappe.utils.nowdate())
 
 	if user:
-		lead_conds += f" AND lead_owner = '{user}'"
-		deal_conds += f" AND deal_owner = '{user}'"
+		conds += " AND r.record_owner = %(user)s"
 
 	result = frappe.db.sql(
 		f"""
 		SELECT
-			DATE_FORMAT(date, '%%Y-%%m-%%d') AS date,
-			SUM(leads) AS leads,
-			SUM(deals) AS deals,
-			SUM(won_deals) AS won_deals
-		FROM (
-			SELECT
-				DATE(creation) AS date,
-				COUNT(*) AS leads,
-				0 AS deals,
-				0 AS won_deals
-			FROM `tabCRM Lead`
-			WHERE DATE(creation) BETWEEN %(from)s AND %(to)s
-			{lead_conds}
-			GROUP BY DATE(creation)
-
-			UNION ALL
-
-			SELECT
-				DATE(d.creation) AS date,
-				0 AS leads,
-				COUNT(*) AS deals,
-				SUM(CASE WHEN s.type = 'Won' THEN 1 ELSE 0 END) AS won_deals
-			FROM `tabCRM Deal` d
-			JOIN `tabCRM Deal Status` s ON d.status = s.name
-			WHERE DATE(d.creation) BETWEEN %(from)s AND %(to)s
-			{deal_conds}
-			GROUP BY DATE(d.creation)
-		) AS daily
-		GROUP BY date
-		ORDER BY date
+			DATE_FORMAT(r.date, '%%Y-%%m-%%d') AS date,
+			SUM(CASE WHEN r.reference_doctype = 'CRM Lead' THEN r.record_count ELSE 0 END) AS leads,
+			SUM(CASE WHEN r.reference_doctype = 'CRM Deal' THEN r.record_count ELSE 0 END) AS deals,
+			SUM(CASE WHEN s.type = 'Won' THEN r.record_count ELSE 0 END) AS won_deals
+		FROM `tabCRM Dashboard Rollup` r
+		LEFT JOIN `tabCRM Deal Status` s ON r.reference_doctype = 'CRM Deal' AND r.status = s.name
+		WHERE r.date_basis = 'Created' AND r.reference_doctype IN ('CRM Lead', 'CRM Deal')
+			AND r.date BETWEEN %(from)s AND %(to)s
+			{conds}
+		GROUP BY r.date
+		ORDER BY r.date
 		""",
-		{"from": from_date, "to": to_date},
+		{"from": from_date, "to": to_date, "user": user},
 		as_dict=True,
 	)
 
@@ -625,34 +519,36 @@ def get_forecasted_revenue(from_date="", to_date="", user=""):
 		...
 	]
 	"""
-	deal_conds = ""
+	conds = ""
 
 	if user:
-		deal_conds += f" AND d.deal_owner = '{user}'"
+		conds += " AND r.record_owner = %(user)s"
 
 	result = frappe.db.sql(
 		f"""
 		SELECT
-			DATE_FORMAT(d.expected_closure_date, '%Y-%m')                        AS month,
+			DATE_FORMAT(r.date, '%%Y-%%m')                                   AS month,
 			SUM(
 				CASE
-					WHEN s.type = 'Lost' THEN d.expected_deal_value * IFNULL(d.exchange_rate, 1)
-					ELSE d.expected_deal_value * IFNULL(d.probability, 0) / 100 * IFNULL(d.exchange_rate, 1)  -- forecasted
+					WHEN s.type = 'Lost' THEN r.expected_value
+					ELSE r.weighted_value                                    -- forecasted
 				END
 			)                                                       AS forecasted,
 			SUM(
 				CASE
-					WHEN s.type = 'Won' THEN d.deal_value * IFNULL(d.exchange_rate, 1)            -- actual
+					WHEN s.type = 'Won' THEN r.deal_value                    -- actual
 					ELSE 0
 				END
 			)                                                       AS actual
-		FROM `tabCRM Deal` AS d
-		JOIN `tabCRM Deal Status` s ON d.status = s.name
-		WHERE d.expected_closure_date >= DATE_SUB(CURDATE(), INTERVAL 12 MONTH)
-		{deal_conds}
-		GROUP BY DATE_FORMAT(d.expected_closure_date, '%Y-%m')
+		FROM `tabCRM Dashboard Rollup` r
+		JOIN `tabCRM Deal Status` s ON r.status = s.name
+		WHERE r.date_basis = 'Expected Closure' AND r.reference_doctype = 'CRM Deal'
+			AND r.date >= DATE_SUB(CURDATE(), INTERVAL 12 MONTH)
+			{conds}
+		GROUP BY DATE_FORMAT(r.date, '%%Y-%%m')
 		ORDER BY month
 		""",
+		{"user": user},
 		as_dict=True,
 	)
 
@@ -693,7 +589,7 @@ def get_funnel_conversion(from_date="", to_date="", user=""):
 		...
 	]
 	"""
-	lead_conds = ""
+	conds = ""
 	deal_conds = ""
 
 	if not from_date or not to_date:
@@ -701,27 +597,29 @@ def get_funnel_conversion(from_date="", to_date="", user=""):
 		to_date = frappe.utils.get_last_day(to_date or frappe.utils.nowdate())
 
 	if user:
-		lead_conds += f" AND lead_owner = '{user}'"
-		deal_conds += f" AND deal_owner = '{user}'"
+		conds += " AND r.record_owner = %(user)s"
+		deal_conds += " AND d.deal_owner = %(user)s"
 
 	result = []
 
 	# Get total leads
 	total_leads = frappe.db.sql(
 		f"""
-			SELECT COUNT(*) AS count
-			FROM `tabCRM Lead`
-			WHERE DATE(creation) BETWEEN %(from)s AND %(to)s
-			{lead_conds}
+			SELECT SUM(r.record_count) AS count
+			FROM `tabCRM Dashboard Rollup` r
+			WHERE r.date_basis = 'Created' AND r.reference_doctype = 'CRM Lead'
+				AND r.date BETWEEN %(from)s AND %(to)s
+				{conds}
 		""",
-		{"from": from_date, "to": to_date},
+		{"from": from_date, "to": to_date, "user": user},
 		as_dict=True,
 	)
-	total_leads_count = total_leads[0].count if total_leads else 0
+	total_leads_count = (total_leads[0].count or 0) if total_leads else 0
 
 	result.append({"stage": "Leads", "count": total_leads_count})
 
-	result += get_deal_status_change_counts(from_date, to_date, deal_conds)
+	# stages reached come from the status change log, which is not part of the rollup
+	result += get_deal_status_change_counts(from_date, to_date, deal_conds, user)
 
 	return {
 		"data": result or [],
@@ -757,29 +655,30 @@ def get_deals_by_stage_axis(from_date="", to_date="", user=""):
 		...
 	]
 	"""
-	deal_conds = ""
+	conds = ""
 
 	if not from_date or not to_date:
 		from_date = frappe.utils.get_first_day(from_date or frappe.utils.nowdate())
 		to_date = frappe.utils.get_last_day(to_date or frappe.utils.nowdate())
 
 	if user:
-		deal_conds += f" AND d.deal_owner = '{user}'"
+		conds += " AND r.record_owner = %(user)s"
 
 	result = frappe.db.sql(
 		f"""
 		SELECT
-			d.status AS stage,
-			COUNT(*) AS count,
+			r.status AS stage,
+			SUM(r.record_count) AS count,
 			s.type AS status_type
-		FROM `tabCRM Deal` AS d
-		JOIN `tabCRM Deal Status` s ON d.status = s.name
-		WHERE DATE(d.creation) BETWEEN %(from)s AND %(to)s AND s.type NOT IN ('Lost')
-		{deal_conds}
-		GROUP BY d.status
+		FROM `tabCRM Dashboard Rollup` r
+		JOIN `tabCRM Deal Status` s ON r.status = s.name
+		WHERE r.date_basis = 'Created' AND r.reference_doctype = 'CRM Deal'
+			AND r.date BETWEEN %(from)s AND %(to)s AND s.type NOT IN ('Lost')
+		{conds}
+		GROUP BY r.status
 		ORDER BY count DESC
 		""",
-		{"from": from_date, "to": to_date},
+		{"from": from_date, "to": to_date, "user": user},
 		as_dict=True,
 	)
 
@@ -807,29 +706,30 @@ def get_deals_by_stage_donut(from_date="", to_date="", user=""):
 		...
 	]
 	"""
-	deal_conds = ""
+	conds = ""
 
 	if not from_date or not to_date:
 		from_date = frappe.utils.get_first_day(from_date or frappe.utils.nowdate())
 		to_date = frappe.utils.get_last_day(to_date or frappe.utils.nowdate())
 
 	if user:
-		deal_conds += f" AND d.deal_owner = '{user}'"
+		conds += " AND r.record_owner = %(user)s"
 
 	result = frappe.db.sql(
 		f"""
 		SELECT
-			d.status AS stage,
-			COUNT(*) AS count,
+			r.status AS stage,
+			SUM(r.record_count) AS count,
 			s.type AS status_type
-		FROM `tabCRM Deal` AS d
-		JOIN `tabCRM Deal Status` s ON d.status = s.name
-		WHERE DATE(d.creation) BETWEEN %(from)s AND %(to)s
-		{deal_conds}
-		GROUP BY d.status
+		FROM `tabCRM Dashboard Rollup` r
+		JOIN `tabCRM Deal Status` s ON r.status = s.name
+		WHERE r.date_basis = 'Created' AND r.reference_doctype = 'CRM Deal'
+			AND r.date BETWEEN %(from)s AND %(to)s
+		{conds}
+		GROUP BY r.status
 		ORDER BY count DESC
 		""",
-		{"from": from_date, "to": to_date},
+		{"from": from_date, "to": to_date, "user": user},
 		as_dict=True,
 	)
 
@@ -852,29 +752,30 @@ def get_lost_deal_reasons(from_date="", to_date="", user=""):
 	]
 	"""
 
-	deal_conds = ""
+	conds = ""
 
 	if not from_date or not to_date:
 		from_date = frappe.utils.get_first_day(from_date or frappe.utils.nowdate())
 		to_date = frappe.utils.get_last_day(to_date or frappe.utils.nowdate())
 
 	if user:
-		deal_conds += f" AND d.deal_owner = '{user}'"
+		conds += " AND r.record_owner = %(user)s"
 
 	result = frappe.db.sql(
 		f"""
 		SELECT
-			d.lost_reason AS reason,
-			COUNT(*) AS count
-		FROM `tabCRM Deal` AS d
-		JOIN `tabCRM Deal Status` s ON d.status = s.name
-		WHERE DATE(d.creation) BETWEEN %(from)s AND %(to)s AND s.type = 'Lost'
-		{deal_conds}
-		GROUP BY d.lost_reason
+			r.lost_reason AS reason,
+			SUM(r.record_count) AS count
+		FROM `tabCRM Dashboard Rollup` r
+		JOIN `tabCRM Deal Status` s ON r.status = s.name
+		WHERE r.date_basis = 'Created' AND r.reference_doctype = 'CRM Deal'
+			AND r.date BETWEEN %(from)s AND %(to)s AND s.type = 'Lost'
+		{conds}
+		GROUP BY r.lost_reason
 		HAVING reason IS NOT NULL AND reason != ''
 		ORDER BY count DESC
 		""",
-		{"from": from_date, "to": to_date},
+		{"from": from_date, "to": to_date, "user": user},
 		as_dict=True,
 	)
 
@@ -905,27 +806,28 @@ def get_leads_by_source(from_date="", to_date="", user=""):
 		...
 	]
 	"""
-	lead_conds = ""
+	conds = ""
 
 	if not from_date or not to_date:
 		from_date = frappe.utils.get_first_day(from_date or frappe.utils.nowdate())
 		to_date = frappe.utils.get_last_day(to_date or frappe.utils.nowdate())
 
 	if user:
-		lead_conds += f" AND lead_owner = '{user}'"
+		conds += " AND r.record_owner = %(user)s"
 
 	result = frappe.db.sql(
 		f"""
 		SELECT
-			IFNULL(source, 'Empty') AS source,
-			COUNT(*) AS count
-		FROM `tabCRM Lead`
-		WHERE DATE(creation) BETWEEN %(from)s AND %(to)s
-		{lead_conds}
-		GROUP BY source
+			IFNULL(NULLIF(r.source, ''), 'Empty') AS source,
+			SUM(r.record_count) AS count
+		FROM `tabCRM Dashboard Rollup` r
+		WHERE r.date_basis = 'Created' AND r.reference_doctype = 'CRM Lead'
+			AND r.date BETWEEN %(from)s AND %(to)s
+		{conds}
+		GROUP BY r.source
 		ORDER BY count DESC
 		""",
-		{"from": from_date, "to": to_date},
+		{"from": from_date, "to": to_date, "user": user},
 		as_dict=True,
 	)
 
@@ -947,27 +849,28 @@ def get_deals_by_source(from_date="", to_date="", user=""):
 		...
 	]
 	"""
-	deal_conds = ""
+	conds = ""
 
 	if not from_date or not to_date:
 		from_date = frappe.utils.get_first_day(from_date or frappe.utils.nowdate())
 		to_date = frappe.utils.get_last_day(to_date or frappe.utils.nowdate())
 
 	if user:
-		deal_conds += f" AND deal_owner = '{user}'"
+		conds += " AND r.record_owner = %(user)s"
 
 	result = frappe.db.sql(
 		f"""
 		SELECT
-			IFNULL(source, 'Empty') AS source,
-			COUNT(*) AS count
-		FROM `tabCRM Deal`
-		WHERE DATE(creation) BETWEEN %(from)s AND %(to)s
-		{deal_conds}
-		GROUP BY source
+			IFNULL(NULLIF(r.source, ''), 'Empty') AS source,
+			SUM(r.record_count) AS count
+		FROM `tabCRM Dashboard Rollup` r
+		WHERE r.date_basis = 'Created' AND r.reference_doctype = 'CRM Deal'
+			AND r.date BETWEEN %(from)s AND %(to)s
+		{conds}
+		GROUP BY r.source
 		ORDER BY count DESC
 		""",
-		{"from": from_date, "to": to_date},
+		{"from": from_date, "to": to_date, "user": user},
 		as_dict=True,
 	)
 
@@ -989,28 +892,29 @@ def get_deals_by_territory(from_date="", to_date="", user=""):
 		...
 	]
 	"""
-	deal_conds = ""
+	conds = ""
 
 	if not from_date or not to_date:
 		from_date = frappe.utils.get_first_day(from_date or frappe.utils.nowdate())
 		to_date = frappe.utils.get_last_day(to_date or frappe.utils.nowdate())
 
 	if user:
-		deal_conds += f" AND d.deal_owner = '{user}'"
+		conds += " AND r.record_owner = %(user)s"
 
 	result = frappe.db.sql(
 		f"""
 		SELECT
-			IFNULL(d.territory, 'Empty') AS territory,
-			COUNT(*) AS deals,
-			SUM(COALESCE(d.deal_value, 0) * IFNULL(d.exchange_rate, 1)) AS value
-		FROM `tabCRM Deal` AS d
-		WHERE DATE(d.creation) BETWEEN %(from)s AND %(to)s
-		{deal_conds}
-		GROUP BY d.territory
+			IFNULL(NULLIF(r.territory, ''), 'Empty') AS territory,
+			SUM(r.record_count) AS deals,
+			SUM(r.deal_value) AS value
+		FROM `tabCRM Dashboard Rollup` r
+		WHERE r.date_basis = 'Created' AND r.reference_doctype = 'CRM Deal'
+			AND r.date BETWEEN %(from)s AND %(to)s
+		{conds}
+		GROUP BY r.territory
 		ORDER BY value DESC
 		""",
-		{"from": from_date, "to": to_date},
+		{"from": from_date, "to": to_date, "user": user},
 		as_dict=True,
 	)
 
@@ -1045,29 +949,30 @@ def get_deals_by_salesperson(from_date="", to_date="", user=""):
 		...
 	]
 	"""
-	deal_conds = ""
+	conds = ""
 
 	if not from_date or not to_date:
 		from_date = frappe.utils.get_first_day(from_date or frappe.utils.nowdate())
 		to_date = frappe.utils.get_last_day(to_date or frappe.utils.nowdate())
 
 	if user:
-		deal_conds += f" AND d.deal_owner = '{user}'"
+		conds += " AND r.record_owner = %(user)s"
 
 	result = frappe.db.sql(
 		f"""
 		SELECT
-			IFNULL(u.full_name, d.deal_owner) AS salesperson,
-			COUNT(*)                           AS deals,
-			SUM(COALESCE(d.deal_value, 0) * IFNULL(d.exchange_rate, 1)) AS value
-		FROM `tabCRM Deal` AS d
-		LEFT JOIN `tabUser` AS u ON u.name = d.deal_owner
-		WHERE DATE(d.creation) BETWEEN %(from)s AND %(to)s
-		{deal_conds}
-		GROUP BY d.deal_owner
+			IFNULL(u.full_name, r.record_owner) AS salesperson,
+			SUM(r.record_count)                  AS deals,
+			SUM(r.deal_value)                    AS value
+		FROM `tabCRM Dashboard Rollup` r
+		LEFT JOIN `tabUser` AS u ON u.name = r.record_owner
+		WHERE r.date_basis = 'Created' AND r.reference_doctype = 'CRM Deal'
+			AND r.date BETWEEN %(from)s AND %(to)s
+		{conds}
+		GROUP BY r.record_owner
 		ORDER BY value DESC
 		""",
-		{"from": from_date, "to": to_date},
+		{"from": from_date, "to": to_date, "user": user},
 		as_dict=True,
 	)
 
@@ -1101,7 +1006,7 @@ def get_base_currency_symbol():
 	return frappe.db.get_value("Currency", base_currency, "symbol") or ""
 
 
-def get_deal_status_change_counts(from_date, to_date, deal_conds=""):
+def get_deal_status_change_counts(from_date, to_date, deal_conds="", user=""):
 	"""
 	Get count of each status change (to) for each deal, excluding deals with current status type 'Lost'.
 	Order results by status position.
@@ -1129,14 +1034,14 @@ def get_deal_status_change_counts(from_date, to_date, deal_conds=""):
 			scl.to IS NOT NULL
 			AND scl.to != ''
 			AND s.type != 'Lost'
-			AND DATE(d.creation) BETWEEN %(from)s AND %(to)s
+			AND d.creation >= %(from)s AND d.creation < %(to)s
 			{deal_conds}
 		GROUP BY
 			scl.to, st.position
 		ORDER BY
 			st.position ASC
 		""",
-		{"from": from_date, "to": to_date},
+		{"from": from_date, "to": frappe.utils.add_days(to_date, 1), "user": user},
 		as_dict=True,
 	)
 	return result or []
@@ -1,4 +1,6 @@
+import base64
 import json
+import re
 
 import frappe
 from frappe import _
@@ -6,9 +8,10 @@ from frappe.custom.doctype.property_setter.property_setter import make_property_
 from frappe.desk.form.assign_to import set_status
 from frappe.model import no_value_fields
 from frappe.model.document import get_controller
-from frappe.utils import make_filter_tuple
+from frappe.utils import cint, make_filter_tuple
 from pypika import Criterion
 
+from crm.api.list_count import get_total_count
 from crm.api.views import get_views
 from crm.fcrm.doctype.crm_form_script.crm_form_script import get_form_script
 from crm.utils import get_dynamic_linked_docs, get_linked_docs
@@ -288,6 +291,8 @@ def get_data(
 	kanban_fields=[],
 	view=None,
 	default_filters=None,
+	use_cursor=False,
+	cursor=None,
 ):
 	custom_view = False
 	filters = frappe._dict(filters)
@@ -318,6 +323,7 @@ def get_data(
 
 	is_default = True
 	data = []
+	next_cursor = None
 	_list = get_controller(doctype)
 	default_rows = []
 	if hasattr(_list, "default_list_data"):
@@ -380,16 +386,19 @@ def get_data(
 		if "name" not in rows:
 			rows.append("name")
 
-		data = (
-			frappe.get_list(
-				doctype,
-				fields=rows,
-				filters=filters,
-				order_by=order_by,
-				page_length=page_length,
+		if cint(use_cursor):
+			data, next_cursor = get_list_page_after_cursor(doctype, rows, filters, order_by, page_length, cursor)
+		else:
+			data = (
+				frappe.get_list(
+					doctype,
+					fields=rows,
+					filters=filters,
+					order_by=order_by,
+					page_length=page_length,
+				)
+				or []
 			)
-			or []
-		)
 		data = parse_list_data(data, doctype)
 
 	if view_type == "kanban":
@@ -424,54 +433,7 @@ def get_data(
 			if field not in rows:
 				rows.append(field)
 
-		for kc in kanban_columns:
-			# Start with base filters
-			column_filters = []
-
-			# Convert and add the main filters first
-			if filters:
-				base_filters = convert_filter_to_tuple(doctype, filters)
-				column_filters.extend(base_filters)
-
-			# Add the column-specific filter
-			if column_field and kc.get("name"):
-				column_filters.append([doctype, column_field, "=", kc.get("name")])
-
-			order = kc.get("order")
-			if kc.get("delete"):
-				column_data = []
-			else:
-				page_length = kc.get("page_length", 20)
-
-				if order:
-					column_data = get_records_based_on_order(
-						doctype, rows, column_filters, page_length, order
-					)
-				else:
-					column_data = frappe.get_list(
-						doctype,
-						fields=rows,
-						filters=column_filters,
-						order_by=order_by,
-						page_length=page_length,
-					)
-
-				all_count = frappe.get_list(
-					doctype,
-					filters=column_filters,
-					fields="count(*) as total_count",
-				)[0].total_count
-
-				kc["all_count"] = all_count
-				kc["count"] = len(column_data)
-
-			if order:
-				column_data = sorted(
-					column_data,
-					key=lambda x: order.index(x.get("name")) if x.get("name") in order else len(order),
-				)
-
-			data.append({"column": kc, "fields": kanban_fields, "data": column_data})
+		data = get_kanban_data(doctype, rows, filters, order_by, column_field, kanban_columns, kanban_fields)
 
 	fields = frappe.get_meta(doctype).fields
 	fields = [field for field in fields if field.fieldtype not in no_value_fields]
@@ -545,6 +507,8 @@ def get_data(
 					"options": get_options(field.get("fieldtype"), field.get("options")),
 				}
 
+	total_count = get_total_count(doctype, filters)
+
 	return {
 		"data": data,
 		"columns": columns,
@@ -557,11 +521,11 @@ def get_data(
 		"group_by_field": group_by_field,
 		"page_length": page_length,
 		"page_length_count": page_length_count,
+		"next_cursor": next_cursor,
 		"is_default": is_default,
 		"views": get_views(doctype),
-		"total_count": frappe.get_list(doctype, filters=filters, fields="count(*) as total_count")[
-			0
-		].total_count,
+		"total_count": total_count.count,
+		"is_estimate": total_count.is_estimate,
 		"row_count": len(data),
 		"form_script": get_form_script(doctype),
 		"list_script": get_form_script(doctype, "List"),
@@ -585,6 +549,253 @@ def convert_filter_to_tuple(doctype, filters):
 	return filters
 
 
+def get_kanban_data(doctype, rows, filters, order_by, column_field, kanban_columns, kanban_fields):
+	"""Load every kanban column with a fixed number of queries.
+
+	Columns without a manual card order are read together: one grouped query for the
+	per-column counts and one windowed query that ranks rows inside each column.
+	"""
+	base_filters = convert_filter_to_tuple(doctype, filters) if filters else []
+
+	batched_columns = [
+		kc.get("name")
+		for kc in kanban_columns
+		if column_field and kc.get("name") and not kc.get("delete") and not kc.get("order")
+	]
+	column_counts = get_kanban_column_counts(doctype, base_filters, column_field, batched_columns)
+	column_rows = get_kanban_column_rows(
+		doctype,
+		rows,
+		base_filters,
+		order_by,
+		column_field,
+		batched_columns,
+		max([kc.get("page_length", 20) for kc in kanban_columns] or [20]),
+	)
+
+	data = []
+	for kc in kanban_columns:
+		order = kc.get("order")
+		if kc.get("delete"):
+			column_data = []
+		elif kc.get("name") in batched_columns:
+			page_length = kc.get("page_length", 20)
+			column_data = column_rows.get(kc.get("name"), [])[:page_length]
+			kc["all_count"] = column_counts.get(kc.get("name"), 0)
+			kc["count"] = len(column_data)
+		else:
+			# manually ordered (or unnamed) columns keep the per-column path
+			column_filters = base_filters.copy()
+			if column_field and kc.get("name"):
+				column_filters.append([doctype, column_field, "=", kc.get("name")])
+
+			page_length = kc.get("page_length", 20)
+			if order:
+				column_data = get_records_based_on_order(doctype, rows, column_filters, page_length, order)
+			else:
+				column_data = frappe.get_list(
+					doctype,
+					fields=rows,
+					filters=column_filters,
+					order_by=order_by,
+					page_length=page_length,
+				)
+
+			kc["all_count"] = frappe.get_list(
+				doctype,
+				filters=column_filters,
+				fields="count(*) as total_count",
+			)[0].total_count
+			kc["count"] = len(column_data)
+
+		if order:
+			column_data = sorted(
+				column_data,
+				key=lambda x: order.index(x.get("name")) if x.get("name") in order else len(order),
+			)
+
+		data.append({"column": kc, "fields": kanban_fields, "data": column_data})
+
+	return data
+
+
+def get_kanban_column_counts(doctype, filters, column_field, columns):
+	if not columns:
+		return {}
+
+	counts = frappe.get_list(
+		doctype,
+		filters=[*filters, [doctype, column_field, "in", columns]],
+		fields=[column_field, "count(*) as total_count"],
+		group_by=column_field,
+		order_by=None,
+	)
+	return {d.get(column_field): d.total_count for d in counts}
+
+
+def get_kanban_column_rows(doctype, rows, filters, order_by, column_field, columns, page_length):
+	"""Return the first `page_length` rows of each column, keyed by column value."""
+	if not columns:
+		return {}
+
+	sort_keys = parse_order_by(order_by)
+	fields = list(rows)
+	for fieldname in [column_field, "name", *[key for key, _direction in sort_keys]]:
+		if fieldname not in fields:
+			fields.append(fieldname)
+
+	# permission conditions and filters are applied by get_list, ranking is done on top of it
+	query = frappe.get_list(
+		doctype,
+		fields=fields,
+		filters=[*filters, [doctype, column_field, "in", columns]],
+		order_by=None,
+		limit_page_length=0,
+		run=0,
+	)
+	window_order = ", ".join(f"`{key}` {direction}" for key, direction in sort_keys)
+	records = frappe.db.sql(
+		f"""
+		SELECT * FROM (
+			SELECT kanban.*, ROW_NUMBER() OVER (
+				PARTITION BY kanban.`{column_field}` ORDER BY {window_order}
+			) AS _kanban_rank
+			FROM ({query}) kanban
+		) ranked
+		WHERE _kanban_rank <= %(page_length)s
+		ORDER BY _kanban_rank
+		""",
+		{"page_length": cint(page_length)},
+		as_dict=True,
+	)
+
+	column_rows = {}
+	for record in records:
+		column = record.get(column_field)
+		record.pop("_kanban_rank", None)
+		for fieldname in fields:
+			if fieldname not in rows:
+				record.pop(fieldname, None)
+		column_rows.setdefault(column, []).append(record)
+	return column_rows
+
+
+def parse_order_by(order_by):
+	"""Split an order_by string into (fieldname, direction) pairs, always ending with name."""
+	sort_keys = []
+	for part in (order_by or "modified desc").split(","):
+		tokens = part.strip().split()
+		if not tokens:
+			continue
+		fieldname = tokens[0].replace("`", "").split(".")[-1]
+		direction = tokens[1].lower() if len(tokens) > 1 else "asc"
+		if not re.fullmatch(r"\w+", fieldname) or direction not in ("asc", "desc"):
+			frappe.throw(_("Invalid order by: {0}").format(order_by))
+		sort_keys.append((fieldname, direction))
+
+	if not any(fieldname == "name" for fieldname, _direction in sort_keys):
+		sort_keys.append(("name", sort_keys[-1][1] if sort_keys else "desc"))
+	return sort_keys
+
+
+def get_list_page_after_cursor(doctype, rows, filters, order_by, page_length, cursor=None):
+	"""Return a page of list rows that follows `cursor`, and the cursor for the page after it.
+
+	Rows are located with a seek predicate on the sort keys (plus `name` as a tie breaker)
+	instead of an offset, so deep pages cost the same as the first one.
+	"""
+	page_length = cint(page_length) or 20
+	sort_keys = parse_order_by(order_by)
+	fields = list(rows)
+	for fieldname, _direction in sort_keys:
+		if fieldname not in fields:
+			fields.append(fieldname)
+
+	query = frappe.get_list(
+		doctype,
+		fields=fields,
+		filters=filters,
+		order_by=None,
+		limit_page_length=0,
+		run=0,
+	)
+
+	conditions, values = "", {"page_length": page_length}
+	if cursor:
+		conditions, cursor_values = get_seek_condition(sort_keys, decode_cursor(cursor, len(sort_keys)))
+		values.update(cursor_values)
+		conditions = f"WHERE {conditions}"
+
+	data = frappe.db.sql(
+		f"""
+		SELECT * FROM ({query}) page
+		{conditions}
+		ORDER BY {", ".join(f"`{key}` {direction}" for key, direction in sort_keys)}
+		LIMIT %(page_length)s
+		""",
+		values,
+		as_dict=True,
+	)
+
+	next_cursor = None
+	if len(data) == page_length:
+		next_cursor = encode_cursor([data[-1].get(key) for key, _direction in sort_keys])
+
+	for record in data:
+		for fieldname in fields:
+			if fieldname not in rows:
+				record.pop(fieldname, None)
+
+	return data, next_cursor
+
+
+def get_seek_condition(sort_keys, cursor_values):
+	"""Build `(k1 after v1) OR (k1 = v1 AND k2 after v2) OR ...` for the given sort keys.
+
+	NULLs are placed the way MariaDB sorts them: first in ascending and last in
+	descending order.
+	"""
+	values = {}
+	alternatives = []
+	for i, (key, direction) in enumerate(sort_keys):
+		equal_to_previous = []
+		for j, (previous_key, _direction) in enumerate(sort_keys[:i]):
+			if cursor_values[j] is None:
+				equal_to_previous.append(f"`{previous_key}` IS NULL")
+			else:
+				equal_to_previous.append(f"`{previous_key}` = %(cursor_{j})s")
+
+		value = cursor_values[i]
+		if value is None:
+			after = f"`{key}` IS NOT NULL" if direction == "asc" else None
+		elif direction == "asc":
+			after = f"`{key}` > %(cursor_{i})s"
+		else:
+			after = f"(`{key}` < %(cursor_{i})s OR `{key}` IS NULL)"
+
+		if value is not None:
+			values[f"cursor_{i}"] = value
+		if after:
+			alternatives.append("(" + " AND ".join([*equal_to_previous, after]) + ")")
+
+	return "(" + (" OR ".join(alternatives) or "1 = 0") + ")", values
+
+
+def encode_cursor(values):
+	return base64.urlsafe_b64encode(frappe.safe_encode(frappe.as_json(values, indent=None))).decode()
+
+
+def decode_cursor(cursor, length):
+	try:
+		values = json.loads(base64.urlsafe_b64decode(frappe.safe_encode(cursor)))
+	except ValueError:
+		values = None
+
+	if not isinstance(values, list) or len(values) != length:
+		frappe.throw(_("Invalid cursor, reload the list and try again"))
+	return values
+
+
 def get_records_based_on_order(doctype, rows, filters, page_length, order):
 	records = []
 	filters = convert_filter_to_tuple(doctype, filters)
@@ -0,0 +1,89 @@
+import frappe
+from frappe.utils import now, validate_email_address
+
+from crm.api.list_count import bump_count_cache_version
+
+IMPORT_BATCH_SIZE = 5000
+
+
+def mark_email_group_dirty(email_group):
+	"""
+	Recompute the subscriber count of `email_group` once, just before the current transaction
+	commits, however many members were changed in it.
+	"""
+	if not email_group:
+		return
+
+	if frappe.flags.crm_dirty_email_groups is None:
+		frappe.flags.crm_dirty_email_groups = set()
+		frappe.db.before_commit.add(update_dirty_email_groups)
+		# a rollback drops the before_commit callback, the next mark must register it again
+		frappe.db.after_rollback.add(forget_dirty_email_groups)
+	frappe.flags.crm_dirty_email_groups.add(email_group)
+
+
+def update_dirty_email_groups():
+	for email_group in forget_dirty_email_groups():
+		update_subscriber_count(email_group)
+
+
+def forget_dirty_email_groups():
+	return frappe.flags.pop("crm_dirty_email_groups", None) or set()
+
+
+def update_subscriber_count(email_group):
+	"""Same count as Email Group.update_total_subscribers, without loading the group."""
+	total = frappe.db.count("Email Group Member", {"email_group": email_group, "unsubscribed": 0})
+	frappe.db.set_value("Email Group", email_group, "total_subscribers", total, update_modified=False)
+	return total
+
+
+@frappe.whitelist()
+def import_email_group_members(email_group, emails):
+	"""
+	Add `emails` to `email_group` in bulk, skipping invalid addresses and existing members.
+	Member hooks are not run, the subscriber count is updated once at the end.
+	"""
+	frappe.has_permission("Email Group", "write", email_group, throw=True)
+	emails = frappe.parse_json(emails) if isinstance(emails, str) else emails
+
+	# dict keeps the first occurrence order while dropping duplicates in O(n)
+	valid_emails = list(
+		dict.fromkeys(
+			email
+			for email in ((email or "").strip().lower() for email in emails or [])
+			if email and validate_email_address(email)
+		)
+	)
+
+	subscribers_before = frappe.db.count(
+		"Email Group Member", {"email_group": email_group, "unsubscribed": 0}
+	)
+	for start in range(0, len(valid_emails), IMPORT_BATCH_SIZE):
+		batch = valid_emails[start : start + IMPORT_BATCH_SIZE]
+		existing = set(
+			frappe.get_all(
+				"Email Group Member",
+				filters={"email_group": email_group, "email": ["in", batch]},
+				pluck="email",
+			)
+		)
+		timestamp = now()
+		rows = [
+			(frappe.generate_hash(length=10), timestamp, timestamp, frappe.session.user, frappe.session.user)
+			+ (email_group, email, 0)
+			for email in batch
+			if email not in existing
+		]
+		frappe.db.bulk_insert(
+			"Email Group Member",
+			["name", "creation", "modified", "owner", "modified_by", "email_group", "email", "unsubscribed"],
+			rows,
+			# members added since the lookup above are skipped, not an error
+			ignore_duplicates=True,
+		)
+
+	bump_count_cache_version("Email Group Member")
+	# counted, rows skipped as duplicates by the insert are not added
+	added = update_subscriber_count(email_group) - subscribers_before
+	return {"added": added, "skipped": len(emails or []) - added}
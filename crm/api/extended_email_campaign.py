@@ -1,14 +1,33 @@
+from functools import lru_cache
+from typing import NamedTuple
+
 import frappe
 from frappe import _
-from frappe.utils import add_days, getdate, today, cint
+from frappe.utils import add_days, cint, getdate, now, time_diff_in_seconds, today
 from frappe.utils.background_jobs import enqueue
 from frappe.core.doctype.communication.email import make
+from jinja2 import Template, meta
+
+from crm.api.email_group import mark_email_group_dirty
+from crm.fcrm.doctype.crm_email_campaign_dispatch.crm_email_campaign_dispatch import (
+    add_pending_chunk,
+    complete_chunk,
+    complete_dispatch,
+    get_dispatch_state,
+    mark_dispatched,
+    start_dispatch,
+)
 
 
-def send_mail_extended(entry, email_campaign):
-    """Extended send_mail function that respects unsubscribe status for Email Groups"""
+def send_mail_extended(entry, email_campaign, recipients=None):
+    """
+    Extended send_mail function that respects unsubscribe status for Email Groups.
+    `recipients` limits the send to a chunk of the group's active members.
+    """
     recipient_list = []
-    if email_campaign.email_campaign_for == "Email Group":
+    if recipients is not None:
+        recipient_list = list(recipients)
+    elif email_campaign.email_campaign_for == "Email Group":
         # Only get unsubscribed members (unsubscribed = 0 means active)
         for member in frappe.db.get_list(
             "Email Group Member", 
@@ -43,15 +62,19 @@ def send_mail_extended(entry, email_campaign):
     if not recipient_list or not any(recipient_list):
         return None
 
-    email_template = frappe.get_doc("Email Template", entry.get("email_template"))
+    email_template = get_compiled_email_template(entry.get("email_template"))
     sender = frappe.db.get_value("User", email_campaign.get("sender"), "email")
-    context = {"doc": frappe.get_doc(email_campaign.email_campaign_for, email_campaign.recipient)}
+    context = {"doc": frappe.get_cached_doc(email_campaign.email_campaign_for, email_campaign.recipient)}
+
+    if email_template.personalized:
+        return queue_personalized_emails(email_template, email_campaign, recipient_list, sender, context)
+
     # send mail and link communication to document
-    comm = make(
+    return make(
         doctype="Email Campaign",
         name=email_campaign.name,
-        subject=frappe.render_template(email_template.get("subject"), context),
-        content=frappe.render_template(email_template.response_, context),
+        subject=email_template.subject.render(context),
+        content=email_template.response.render(context),
         sender=sender,
         recipients=recipient_list,
         communication_medium="Email",
@@ -59,7 +82,84 @@ def send_mail_extended(entry, email_campaign):
         send_email=True,
         email_template=email_template.name,
     )
-    return comm
+
+
+def queue_personalized_emails(email_template, email_campaign, recipients, sender, context):
+    """
+    Render a template using `recipient` once per recipient and queue each result directly as an
+    Email Queue entry referencing the campaign. Unlike shared emails, no Communication is made
+    per recipient, a 100k member group would otherwise create 100k Communications.
+    """
+    contexts = get_recipient_contexts(email_campaign, recipients)
+    for email in recipients:
+        recipient_context = {**context, "recipient": contexts.get(email) or frappe._dict(email=email)}
+        frappe.sendmail(
+            recipients=[email],
+            sender=sender,
+            subject=email_template.subject.render(recipient_context),
+            message=email_template.response.render(recipient_context),
+            reference_doctype="Email Campaign",
+            reference_name=email_campaign.name,
+        )
+    return len(recipients)
+
+
+def get_recipient_contexts(email_campaign, emails):
+    """
+    `recipient` template context per email: the Email Group member and the donor with that email,
+    loaded with one query each for the whole chunk.
+    """
+    contexts = {email: frappe._dict(email=email) for email in emails}
+    if email_campaign.email_campaign_for == "Email Group":
+        for member in frappe.get_all(
+            "Email Group Member",
+            filters={"email_group": email_campaign.get("recipient"), "email": ["in", emails]},
+            fields=["name", "email"],
+        ):
+            if member.email in contexts:
+                contexts[member.email].member = member.name
+
+    for donor in frappe.get_all(
+        "Donor", filters={"email": ["in", emails]}, fields=["name", "donor_name", "email"]
+    ):
+        if donor.email in contexts:
+            contexts[donor.email].update(donor=donor.name, donor_name=donor.donor_name)
+
+    return contexts
+
+
+class CompiledEmailTemplate(NamedTuple):
+    name: str
+    subject: Template
+    response: Template
+    personalized: bool
+
+
+def get_compiled_email_template(name):
+    """Email Template compiled to Jinja templates, cached per process until the template is modified."""
+    modified = frappe.get_cached_doc("Email Template", name).modified
+    return compile_email_template(frappe.local.site, name, str(modified))
+
+
+@lru_cache(maxsize=128)
+def compile_email_template(site, name, modified):
+    email_template = frappe.get_cached_doc("Email Template", name)
+    jenv = frappe.get_jenv()
+    sources = [email_template.get("subject") or "", email_template.response_ or ""]
+
+    for source in sources:
+        # same guard as frappe.render_template
+        if ".__" in source:
+            frappe.throw(_("Illegal template"))
+
+    return CompiledEmailTemplate(
+        name=name,
+        subject=jenv.from_string(sources[0]),
+        response=jenv.from_string(sources[1]),
+        personalized=any(
+            "recipient" in meta.find_undeclared_variables(jenv.parse(source)) for source in sources
+        ),
+    )
 
 
 @frappe.whitelist()
@@ -87,6 +187,7 @@ def _process_email_campaigns(force: bool = False, email_campaign_id: str | None
         force_flag = bool(cint(force))
         total_recipients = 0
         updated_campaigns = []
+        dispatched_campaigns = []
         warning_messages = []
 
         # Build filters
@@ -105,23 +206,13 @@ def _process_email_campaigns(force: bool = False, email_campaign_id: str | None
             campaign_recipient_count = 0
             if email_campaign.email_campaign_for == "Email Group":
                 # Only include active members
-                active_members = frappe.get_all(
+                campaign_recipient_count = frappe.db.count(
                     "Email Group Member",
-                    filters={
-                        "email_group": email_campaign.get("recipient"),
-                        "unsubscribed": 0
-                    },
-                    fields=["email"]
+                    {"email_group": email_campaign.get("recipient"), "unsubscribed": 0},
                 )
-                campaign_recipient_count = len(active_members)
                 if campaign_recipient_count == 0:
                     # Check if there are any members at all (including unsubscribed)
-                    total_members = frappe.get_all(
-                        "Email Group Member",
-                        filters={"email_group": email_campaign.get("recipient")},
-                        fields=["email"]
-                    )
-                    if len(total_members) > 0:
+                    if frappe.db.exists("Email Group Member", {"email_group": email_campaign.get("recipient")}):
                         # There are members but all are unsubscribed
                         warning_messages.append(_("All members in email group '{0}' are unsubscribed. No emails will be sent.").format(email_campaign.get("recipient")))
                     continue  # skip if no active members
@@ -138,6 +229,11 @@ def _process_email_campaigns(force: bool = False, email_campaign_id: str | None
             for entry in campaign.get("campaign_schedules"):
                 scheduled_date = add_days(email_campaign.get("start_date"), entry.get("send_after_days"))
                 if force_flag or scheduled_date == getdate(today()):
+                    if email_campaign.email_campaign_for == "Email Group":
+                        # sent in chunks by background jobs, the last one completes the campaign
+                        dispatch_email_group_campaign(entry, email_campaign, campaign_recipient_count, user)
+                        dispatched_campaigns.append(email_campaign.name)
+                        continue
                     # send_mail_extended handles recipients internally and respects unsubscribe status
                     result = send_mail_extended(entry, email_campaign)
                     if result:  # Only mark as sent if there were actual recipients
@@ -151,7 +247,15 @@ def _process_email_campaigns(force: bool = False, email_campaign_id: str | None
         frappe.db.commit()
 
         # Prepare final message
-        if warning_messages and total_recipients > 0:
+        if dispatched_campaigns:
+            # Chunks are still being sent, progress and completion follow from the chunk jobs
+            final_message = _("Sending emails for {0}").format(", ".join(dispatched_campaigns))
+            if total_recipients > 0:
+                final_message = _("Emails sent successfully ({0}). {1}").format(
+                    total_recipients, final_message
+                )
+            status = "In Progress"
+        elif warning_messages and total_recipients > 0:
             # Both warnings and successful sends
             final_message = _("Emails sent successfully ({0}). Warnings: {1}").format(
                 total_recipients, "; ".join(warning_messages)
@@ -199,6 +303,139 @@ def _process_email_campaigns(force: bool = False, email_campaign_id: str | None
         raise
 
 
+EMAIL_CAMPAIGN_CHUNK_SIZE = 500
+
+
+def dispatch_email_group_campaign(entry, email_campaign, total, user=None):
+    """
+    Queue one send job per chunk of the email group's active members, walking them by name.
+
+    The last dispatched member and the chunks not yet sent are checkpointed in a CRM Email
+    Campaign Dispatch row, so dispatching the same schedule again resumes where it stopped
+    instead of resending, even after the cache was cleared.
+    """
+    state = start_dispatch(email_campaign.name, entry.name, total)
+    job_args = {
+        "email_campaign": email_campaign.name,
+        "entry": {"name": entry.name, "email_template": entry.get("email_template")},
+        "user": user,
+    }
+
+    # chunks of a previous run that never finished, still queued ones are deduplicated
+    for chunk_id, (after, last) in state.pending_chunks.items():
+        enqueue_email_campaign_chunk(state.name, chunk_id, after, last, job_args)
+
+    cursor = state.cursor
+    while True:
+        filters = {"email_group": email_campaign.get("recipient"), "unsubscribed": 0}
+        if cursor:
+            filters["name"] = (">", cursor)
+        members = frappe.get_all(
+            "Email Group Member",
+            filters=filters,
+            pluck="name",
+            order_by="name asc",
+            limit=EMAIL_CAMPAIGN_CHUNK_SIZE,
+        )
+        if not members:
+            break
+
+        # committed before the job is queued, so the job always finds its chunk
+        chunk_id = add_pending_chunk(state.name, cursor, members[-1])
+        enqueue_email_campaign_chunk(state.name, chunk_id, cursor, members[-1], job_args)
+        cursor = members[-1]
+
+    mark_dispatched(state.name)
+    finish_email_campaign_dispatch(state.name, user)
+
+
+def enqueue_email_campaign_chunk(dispatch, chunk_id, after, last, job_args):
+    enqueue(
+        method=send_email_campaign_chunk,
+        queue="default",
+        timeout=600,
+        job_id=f"crm_email_campaign_dispatch:{dispatch}:{chunk_id}",
+        deduplicate=True,
+        dispatch=dispatch,
+        chunk_id=chunk_id,
+        after=after,
+        last=last,
+        **job_args,
+    )
+
+
+def send_email_campaign_chunk(dispatch, chunk_id, after, last, email_campaign, entry, user=None):
+    """Send one chunk: the active members named after `after` up to `last`."""
+    if chunk_id not in get_dispatch_state(dispatch).pending_chunks:
+        # sent by an earlier run of this job
+        return
+
+    email_campaign = frappe.get_doc("Email Campaign", email_campaign)
+    filters = [
+        ["email_group", "=", email_campaign.get("recipient")],
+        ["unsubscribed", "=", 0],
+        ["name", "<=", last],
+    ]
+    if after:
+        filters.append(["name", ">", after])
+
+    try:
+        recipients = frappe.get_all("Email Group Member", filters=filters, pluck="email")
+        if recipients:
+            send_mail_extended(frappe._dict(entry), email_campaign, recipients=recipients)
+        # the checkpoint is committed with the queued emails
+        state = complete_chunk(dispatch, chunk_id, len(recipients))
+        frappe.db.commit()
+    except Exception as e:
+        frappe.db.rollback()
+        frappe.log_error(title="Email Campaign Chunk Failed", message=frappe.get_traceback())
+        frappe.publish_realtime(
+            "email_campaign_progress",
+            {
+                "status": "Failed",
+                "email_campaign": email_campaign.name,
+                "message": _("Email sending failed: {0}").format(str(e)),
+            },
+            user=user,
+        )
+        raise
+
+    elapsed = time_diff_in_seconds(now(), state.started_at or now()) or 1
+    frappe.publish_realtime(
+        "email_campaign_progress",
+        {
+            "status": "In Progress",
+            "email_campaign": email_campaign.name,
+            "sent": state.sent,
+            "total": state.total,
+            "emails_per_second": round(state.sent / elapsed, 2),
+        },
+        user=user,
+    )
+    finish_email_campaign_dispatch(dispatch, user)
+
+
+def finish_email_campaign_dispatch(dispatch, user=None):
+    """Complete the campaign once every chunk was dispatched and sent, exactly once."""
+    state = complete_dispatch(dispatch)
+    if not state:
+        frappe.db.commit()
+        return
+
+    frappe.db.set_value("Email Campaign", state.email_campaign, "status", "Completed")
+    frappe.db.commit()
+    frappe.publish_realtime(
+        "email_campaign_progress",
+        {
+            "status": "Completed",
+            "email_campaign": state.email_campaign,
+            "updated_campaigns": [state.email_campaign],
+            "total_recipients": state.sent,
+            "message": _("Emails sent successfully ({0})").format(state.sent),
+        },
+        user=user,
+    )
+
 
 def update_email_group_total_on_member_update(doc, method=None):
     if not doc.email_group:
@@ -208,8 +445,7 @@ def update_email_group_total_on_member_update(doc, method=None):
     if hasattr(doc, "get_doc_before_save") and doc.get_doc_before_save():
         old_group = doc.get_doc_before_save().get("email_group")
 
+    # counted once per group when the transaction commits
     if old_group and old_group != doc.email_group:
-        frappe.get_doc("Email Group", old_group).update_total_subscribers()
-        frappe.get_doc("Email Group", doc.email_group).update_total_subscribers()
-    else:
-        frappe.get_doc("Email Group", doc.email_group).update_total_subscribers()
+        mark_email_group_dirty(old_group)
+    mark_email_group_dirty(doc.email_group)
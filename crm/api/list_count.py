@@ -0,0 +1,115 @@
+import hashlib
+import json
+
+import frappe
+from frappe.utils import cint
+
+COUNT_CACHE_TTL = 5 * 60
+
+
+def get_total_count(doctype, filters):
+	"""Return `{"count": int, "is_estimate": bool}` for a list view.
+
+	Counts of the doctypes in the `list_count_cache_doctypes` hook are cached per doctype, filters
+	and user (the permission scope) until a document of the doctype changes. Above the `List Count
+	Estimate Threshold` set in FCRM Settings the count is estimated from table statistics and a
+	sample of the newest rows.
+	"""
+	cache_key = doctype in frappe.get_hooks("list_count_cache_doctypes") and get_count_cache_key(
+		doctype, filters
+	)
+	if cache_key and (cached := frappe.cache.get_value(cache_key)) is not None:
+		return frappe._dict(cached)
+
+	threshold = cint(frappe.db.get_single_value("FCRM Settings", "list_count_estimate_threshold"))
+	result = threshold and get_estimated_count(doctype, filters, threshold)
+	if not result:
+		result = {"count": get_exact_count(doctype, filters), "is_estimate": False}
+
+	if cache_key:
+		frappe.cache.set_value(cache_key, result, expires_in_sec=COUNT_CACHE_TTL)
+	return frappe._dict(result)
+
+
+def get_exact_count(doctype, filters):
+	return frappe.get_list(doctype, filters=filters, fields="count(*) as total_count")[0].total_count
+
+
+def get_estimated_count(doctype, filters, threshold):
+	"""Estimate the count if more than `threshold` rows match, otherwise return None."""
+	table_rows = get_table_rows_estimate(doctype)
+	if table_rows <= threshold:
+		return None
+
+	# stops scanning as soon as the threshold is crossed
+	matched = count_rows(doctype, filters, limit=threshold + 1)
+	if matched <= threshold:
+		return {"count": matched, "is_estimate": False}
+
+	# selectivity of the filters over the newest `threshold` rows, scaled to the whole table
+	sample_start = frappe.db.sql(
+		f"select creation from `tab{doctype}` order by creation desc limit 1 offset %s",
+		threshold - 1,
+	)
+	if not sample_start:
+		return None
+
+	sample_filters = convert_filters_to_list(doctype, filters)
+	sample_filters.append([doctype, "creation", ">=", sample_start[0][0]])
+	sampled = count_rows(doctype, sample_filters)
+	estimate = round(sampled / threshold * table_rows)
+
+	return {"count": min(max(estimate, threshold + 1), table_rows), "is_estimate": True}
+
+
+def count_rows(doctype, filters, limit=0):
+	query = frappe.get_list(
+		doctype,
+		fields=["name"],
+		filters=filters,
+		order_by=None,
+		limit_page_length=limit,
+		run=0,
+	)
+	return cint(frappe.db.sql(f"select count(*) from ({query}) matched")[0][0])
+
+
+def get_table_rows_estimate(doctype):
+	"""Row count from the database statistics, without scanning the table."""
+	if frappe.db.db_type == "postgres":
+		rows = frappe.db.sql("select reltuples::bigint from pg_class where relname = %s", f"tab{doctype}")
+	else:
+		rows = frappe.db.sql(
+			"""select table_rows from information_schema.tables
+			where table_schema = database() and table_name = %s""",
+			f"tab{doctype}",
+		)
+	return cint(rows[0][0]) if rows else 0
+
+
+def convert_filters_to_list(doctype, filters):
+	from crm.api.doc import convert_filter_to_tuple
+
+	return list(convert_filter_to_tuple(doctype, filters or []))
+
+
+def get_count_cache_key(doctype, filters):
+	normalized_filters = json.dumps(filters or {}, sort_keys=True, default=str)
+	filters_hash = hashlib.sha1(normalized_filters.encode()).hexdigest()
+	version = frappe.cache.get_value(f"crm_list_count_version:{doctype}") or ""
+	return f"crm_list_count:{doctype}:{version}:{frappe.session.user}:{filters_hash}"
+
+
+def clear_count_cache(doc, method=None):
+	"""Doc event: drop cached counts of the document's doctype and its child tables."""
+	doctypes = [doc.doctype]
+	if not doc.meta.istable:
+		doctypes.extend(df.options for df in doc.meta.get_table_fields())
+
+	for doctype in doctypes:
+		bump_count_cache_version(doctype)
+
+
+def bump_count_cache_version(doctype):
+	"""Invalidate cached counts of `doctype`, for changes made without doc events."""
+	frappe.cache.set_value(f"crm_list_count_version:{doctype}", frappe.generate_hash(length=8))
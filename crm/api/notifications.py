@@ -1,47 +1,102 @@
 import frappe
 from frappe.query_builder import Order
+from frappe.utils import cint
+
+from crm.api.doc import decode_cursor, encode_cursor
 
 
 @frappe.whitelist()
 def get_notifications():
+    return [get_notification_row(n) for n in get_notifications_query().run(as_dict=True)]
+
+
+@frappe.whitelist()
+def get_notification_page(page_length=20, cursor=None):
+    """
+    Return one page of the user's notifications, newest first, with a `next_cursor` for the page
+    after it (None on the last page) and the user's `unread_count`.
+    """
+    page_length = cint(page_length) or 20
+    query = get_notifications_query().limit(page_length + 1)
+
+    if cursor:
+        creation, name = decode_cursor(cursor, 2)
+        Notification = frappe.qb.DocType("CRM Notification")
+        query = query.where(
+            (Notification.creation < creation)
+            | ((Notification.creation == creation) & (Notification.name < name))
+        )
+
+    notifications = query.run(as_dict=True)
+    next_cursor = None
+    if len(notifications) > page_length:
+        notifications = notifications[:page_length]
+        next_cursor = encode_cursor([notifications[-1].creation, notifications[-1].name])
+
+    return {
+        "notifications": [get_notification_row(n) for n in notifications],
+        "next_cursor": next_cursor,
+        "unread_count": get_unread_count(),
+    }
+
+
+@frappe.whitelist()
+def get_unread_count():
+    # served by the (to_user, read) index
+    return frappe.db.count("CRM Notification", {"to_user": frappe.session.user, "read": 0})
+
+
+def get_notifications_query():
     Notification = frappe.qb.DocType("CRM Notification")
-    query = (
+    User = frappe.qb.DocType("User")
+    return (
         frappe.qb.from_(Notification)
-        .select("*")
+        .left_join(User)
+        .on(User.name == Notification.from_user)
+        .select(
+            Notification.name,
+            Notification.creation,
+            Notification.from_user,
+            User.full_name.as_("from_user_full_name"),
+            Notification.type,
+            Notification.to_user,
+            Notification.read,
+            Notification.message,
+            Notification.notification_text,
+            Notification.notification_type_doctype,
+            Notification.notification_type_doc,
+            Notification.reference_doctype,
+            Notification.reference_name,
+        )
         .where(Notification.to_user == frappe.session.user)
-        .orderby("creation", order=Order.desc)
+        .orderby(Notification.creation, order=Order.desc)
+        .orderby(Notification.name, order=Order.desc)
     )
-    notifications = query.run(as_dict=True)
 
-    _notifications = []
-    for notification in notifications:
-        _notifications.append(
-            {
-                "creation": notification.creation,
-                "from_user": {
-                    "name": notification.from_user,
-                    "full_name": frappe.get_value(
-                        "User", notification.from_user, "full_name"
-                    ),
-                },
-                "type": notification.type,
-                "to_user": notification.to_user,
-                "read": notification.read,
-                "hash": get_hash(notification),
-                "notification_text": notification.notification_text,
-                "notification_type_doctype": notification.notification_type_doctype,
-                "notification_type_doc": notification.notification_type_doc,
-                "reference_doctype": (
-                    "deal" if notification.reference_doctype == "CRM Deal" else "lead"
-                ),
-                "reference_name": notification.reference_name,
-                "route_name": (
-                    "Deal" if notification.reference_doctype == "CRM Deal" else "Lead"
-                ),
-            }
-        )
 
-    return _notifications
+def get_notification_row(notification):
+    return {
+        "name": notification.name,
+        "creation": notification.creation,
+        "from_user": {
+            "name": notification.from_user,
+            "full_name": notification.from_user_full_name,
+        },
+        "type": notification.type,
+        "to_user": notification.to_user,
+        "read": notification.read,
+        "hash": get_hash(notification),
+        "notification_text": notification.notification_text,
+        "notification_type_doctype": notification.notification_type_doctype,
+        "notification_type_doc": notification.notification_type_doc,
+        "reference_doctype": (
+            "deal" if notification.reference_doctype == "CRM Deal" else "lead"
+        ),
+        "reference_name": notification.reference_name,
+        "route_name": (
+            "Deal" if notification.reference_doctype == "CRM Deal" else "Lead"
+        ),
+    }
 
 
 @frappe.whitelist()
@@ -69,6 +124,6 @@ def get_hash(notification):
 
     if notification.type == "Assignment" and notification.notification_type_doctype == "CRM Task":
         _hash = "#tasks"
-        if "has been removed by" in notification.message:
+        if "has been removed by" in (notification.message or ""):
             _hash = ""
     return _hash
\ No newline at end of file
@@ -0,0 +1,79 @@
+"""
+Compare dashboard query plans and timings before and after the sargable date predicates.
+
+Run with:
+	bench --site <site> execute crm.benchmarks.dashboard.run --kwargs "{'from_date': '2025-01-01', 'to_date': '2025-01-31'}"
+"""
+
+import time
+
+import frappe
+
+QUERIES = [
+	(
+		"Leads in period",
+		"""SELECT COUNT(*) FROM `tabCRM Lead`
+		WHERE DATE(creation) BETWEEN %(from_date)s AND %(to_date)s""",
+		"""SELECT COUNT(*) FROM `tabCRM Lead`
+		WHERE creation >= %(from_date)s AND creation < %(to_date_next)s""",
+	),
+	(
+		"Leads of an owner in period",
+		"""SELECT COUNT(*) FROM `tabCRM Lead`
+		WHERE DATE(creation) BETWEEN %(from_date)s AND %(to_date)s AND lead_owner = %(user)s""",
+		"""SELECT COUNT(*) FROM `tabCRM Lead`
+		WHERE creation >= %(from_date)s AND creation < %(to_date_next)s AND lead_owner = %(user)s""",
+	),
+	(
+		"Deals by source in period",
+		"""SELECT source, COUNT(*) FROM `tabCRM Deal`
+		WHERE DATE(creation) BETWEEN %(from_date)s AND %(to_date)s GROUP BY source""",
+		"""SELECT source, SUM(record_count) FROM `tabCRM Dashboard Rollup`
+		WHERE date_basis = 'Created' AND reference_doctype = 'CRM Deal'
+			AND date >= %(from_date)s AND date < %(to_date_next)s GROUP BY source""",
+	),
+	(
+		"Won deals by closure date",
+		"""SELECT COUNT(*) FROM `tabCRM Deal` d JOIN `tabCRM Deal Status` s ON d.status = s.name
+		WHERE DATE(d.closed_date) BETWEEN %(from_date)s AND %(to_date)s AND s.type = 'Won'""",
+		"""SELECT COUNT(*) FROM `tabCRM Deal` d JOIN `tabCRM Deal Status` s ON d.status = s.name
+		WHERE d.closed_date >= %(from_date)s AND d.closed_date < %(to_date_next)s AND s.type = 'Won'""",
+	),
+	(
+		"Status changes of deals created in period",
+		"""SELECT scl.to, COUNT(*) FROM `tabCRM Status Change Log` scl
+		JOIN `tabCRM Deal` d ON scl.parent = d.name
+		WHERE DATE(d.creation) BETWEEN %(from_date)s AND %(to_date)s GROUP BY scl.to""",
+		"""SELECT scl.to, COUNT(*) FROM `tabCRM Status Change Log` scl
+		JOIN `tabCRM Deal` d ON scl.parent = d.name
+		WHERE d.creation >= %(from_date)s AND d.creation < %(to_date_next)s GROUP BY scl.to""",
+	),
+]
+
+
+def run(from_date=None, to_date=None, user=None, repeat=5):
+	from_date = from_date or frappe.utils.get_first_day(frappe.utils.nowdate())
+	to_date = to_date or frappe.utils.get_last_day(frappe.utils.nowdate())
+	values = {
+		"from_date": from_date,
+		"to_date": to_date,
+		"to_date_next": frappe.utils.add_days(to_date, 1),
+		"user": user or frappe.session.user,
+	}
+
+	for label, before, after in QUERIES:
+		print(f"\n== {label}")
+		for name, query in (("before", before), ("after", after)):
+			print(f"-- {name}: {time_query(query, values, repeat):.2f} ms")
+			for row in frappe.db.sql(f"EXPLAIN {query}", values, as_dict=True):
+				print(
+					f"   table={row.get('table')} type={row.get('type')} key={row.get('key')}"
+					f" rows={row.get('rows')} extra={row.get('Extra')}"
+				)
+
+
+def time_query(query, values, repeat):
+	start = time.monotonic()
+	for _i in range(repeat):
+		frappe.db.sql(query, values)
+	return (time.monotonic() - start) * 1000 / repeat
@@ -0,0 +1,48 @@
+"""
+Compare phone number parsing throughput with and without the LRU cache in crm.utils.
+
+Run with:
+	bench --site <site> execute crm.benchmarks.phone.run --kwargs "{'count': 100000}"
+"""
+
+import random
+import time
+
+import phonenumbers
+from phonenumbers import PhoneNumberFormat as PNF
+
+from crm.utils import are_same_phone_number, get_parsed_phone_number, parse_phone_number
+
+FORMATS = ["+92 300 {0}{1}", "0300-{0}{1}", "(0300) {0} {1}", "+92300{0}{1}"]
+
+
+def run(count=100000, distinct=5000, seed=42):
+	"""Parse `count` numbers drawn from `distinct` subscribers, written in mixed formats."""
+	rng = random.Random(seed)
+	subscribers = [(f"{rng.randrange(1000):03}", f"{rng.randrange(10000):04}") for _i in range(distinct)]
+	numbers = [rng.choice(FORMATS).format(*rng.choice(subscribers)) for _i in range(count)]
+
+	def uncached():
+		for number in numbers:
+			parsed = phonenumbers.parse(number, "PK")
+			phonenumbers.is_valid_number(parsed)
+			phonenumbers.format_number(parsed, PNF.E164)
+
+	def cached():
+		for number in numbers:
+			get_parsed_phone_number(number, "PK")
+
+	def helpers():
+		for number in numbers:
+			parse_phone_number(number, "PK")
+			are_same_phone_number(number, numbers[0], "PK")
+
+	print(f"{count} numbers, {distinct} distinct subscribers")
+	for label, fn in (("phonenumbers.parse", uncached), ("cached parse", cached), ("crm.utils helpers", helpers)):
+		get_parsed_phone_number.cache_clear()
+		start = time.monotonic()
+		fn()
+		elapsed = time.monotonic() - start
+		print(f"-- {label}: {elapsed * 1000:.0f} ms, {count / elapsed:,.0f} numbers/s")
+
+	print(get_parsed_phone_number.cache_info())
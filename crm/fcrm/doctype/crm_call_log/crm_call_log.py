@@ -4,7 +4,7 @@
 import frappe
 from frappe.model.document import Document
 
-from crm.integrations.api import get_contact_by_phone_number
+from crm.integrations.api import get_contact_by_phone_number, get_contacts_by_phone_numbers
 from crm.utils import seconds_to_duration
 
 
@@ -81,7 +81,7 @@ class CRMCallLog(Document):
 		return {"columns": columns, "rows": rows}
 
 	def parse_list_data(calls):
-		return [parse_call_log(call) for call in calls] if calls else []
+		return parse_call_logs(calls) if calls else []
 
 	def has_link(self, doctype, name):
 		for link in self.links:
@@ -95,17 +95,41 @@ class CRMCallLog(Document):
 		self.append("links", {"link_doctype": reference_doctype, "link_name": reference_name})
 
 
-def parse_call_log(call):
+def parse_call_logs(calls):
+	"""
+	`parse_call_log` for a list of calls, resolving all their contacts and users up front with a
+	few set-based queries instead of per call.
+	"""
+	numbers, users = [], set()
+	for call in calls:
+		if call.get("type") == "Incoming":
+			numbers.append(call.get("from"))
+			users.add(call.get("receiver"))
+		elif call.get("type") == "Outgoing":
+			numbers.append(call.get("to"))
+			users.add(call.get("caller"))
+
+	contacts = get_contacts_by_phone_numbers(numbers)
+	users.discard(None)
+	user_info = {}
+	if users:
+		user_info = {
+			user.name: [user.full_name, user.user_image]
+			for user in frappe.get_all(
+				"User", filters={"name": ["in", list(users)]}, fields=["name", "full_name", "user_image"]
+			)
+		}
+
+	return [parse_call_log(call, contacts, user_info) for call in calls]
+
+
+def parse_call_log(call, contacts=None, users=None):
 	call["show_recording"] = False
 	call["_duration"] = seconds_to_duration(call.get("duration"))
 	if call.get("type") == "Incoming":
 		call["activity_type"] = "incoming_call"
-		contact = get_contact_by_phone_number(call.get("from"))
-		receiver = (
-			frappe.db.get_values("User", call.get("receiver"), ["full_name", "user_image"])[0]
-			if call.get("receiver")
-			else [None, None]
-		)
+		contact = get_call_contact(call.get("from"), contacts)
+		receiver = get_call_user(call.get("receiver"), users)
 		call["_caller"] = {
 			"label": contact.get("full_name", "Unknown"),
 			"image": contact.get("image"),
@@ -116,12 +140,8 @@ def parse_call_log(call):
 		}
 	elif call.get("type") == "Outgoing":
 		call["activity_type"] = "outgoing_call"
-		contact = get_contact_by_phone_number(call.get("to"))
-		caller = (
-			frappe.db.get_values("User", call.get("caller"), ["full_name", "user_image"])[0]
-			if call.get("caller")
-			else [None, None]
-		)
+		contact = get_call_contact(call.get("to"), contacts)
+		caller = get_call_user(call.get("caller"), users)
 		call["_caller"] = {
 			"label": caller[0],
 			"image": caller[1],
@@ -134,6 +154,20 @@ def parse_call_log(call):
 	return call
 
 
+def get_call_contact(phone_number, contacts=None):
+	if contacts is not None:
+		return contacts.get(phone_number) or {"mobile_no": phone_number}
+	return get_contact_by_phone_number(phone_number)
+
+
+def get_call_user(user, users=None):
+	if not user:
+		return [None, None]
+	if users is not None:
+		return users.get(user, [None, None])
+	return frappe.db.get_values("User", user, ["full_name", "user_image"])[0]
+
+
 @frappe.whitelist()
 def get_call_log(name):
 	call = frappe.get_cached_doc(
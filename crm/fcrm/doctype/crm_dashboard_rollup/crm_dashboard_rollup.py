@@ -0,0 +1,246 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import hashlib
+from datetime import datetime, time
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import flt, get_datetime, getdate, now
+
+ROLLUP_DIMENSIONS = [
+	"date",
+	"date_basis",
+	"reference_doctype",
+	"record_owner",
+	"status",
+	"source",
+	"territory",
+	"lost_reason",
+]
+ROLLUP_MEASURES = [
+	"record_count",
+	"deal_value",
+	"expected_value",
+	"weighted_value",
+	"days_to_close",
+	"lead_days_to_close",
+]
+
+
+class CRMDashboardRollup(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("CRM Dashboard Rollup", ["date_basis", "reference_doctype", "date"])
+
+
+def update_dashboard_rollup(doc, method=None):
+	"""
+	Doc event for CRM Lead & CRM Deal: move the document's contribution from the rollup rows
+	of its previous values to the rows of its current values.
+	"""
+	if method == "on_trash":
+		old_doc, new_doc = doc, None
+	else:
+		old_doc, new_doc = doc.get_doc_before_save(), doc
+		if not old_doc and not doc.flags.in_insert:
+			# nothing to diff against, the nightly rebuild will pick the change up
+			return
+
+	deltas = {}
+	for sign, d in ((-1, old_doc), (1, new_doc)):
+		if not d:
+			continue
+		# each side counts against its own lead, the lead of a deal can change
+		lead_creation = None
+		if d.doctype == "CRM Deal" and d.lead:
+			lead_creation = frappe.db.get_value("CRM Lead", d.lead, "creation")
+		for row in get_rollup_rows(d, lead_creation):
+			key = tuple(row.get(dimension) for dimension in ROLLUP_DIMENSIONS)
+			delta = deltas.setdefault(key, dict.fromkeys(ROLLUP_MEASURES, 0))
+			for measure in ROLLUP_MEASURES:
+				delta[measure] += sign * row.get(measure, 0)
+
+	for key, delta in deltas.items():
+		if any(delta.values()):
+			add_to_rollup_row(dict(zip(ROLLUP_DIMENSIONS, key, strict=True)), delta)
+
+
+def get_rollup_rows(doc, lead_creation=None):
+	"""Rollup rows a single lead or deal contributes to, one per date basis."""
+	dimensions = {
+		"reference_doctype": doc.doctype,
+		"status": doc.status or "",
+		"source": doc.source or "",
+		"territory": doc.territory or "",
+	}
+
+	if doc.doctype == "CRM Lead":
+		dimensions.update(record_owner=doc.lead_owner or "", lost_reason="")
+		return [{**dimensions, "date": getdate(doc.creation), "date_basis": "Created", "record_count": 1}]
+
+	dimensions.update(record_owner=doc.deal_owner or "", lost_reason=doc.lost_reason or "")
+	# an unset exchange rate is stored as 0 and counts as 1, like in rebuild_dashboard_rollup
+	exchange_rate = flt(doc.exchange_rate) or 1
+	deal_value = flt(doc.deal_value) * exchange_rate
+	rows = [
+		{
+			**dimensions,
+			"date": getdate(doc.creation),
+			"date_basis": "Created",
+			"record_count": 1,
+			"deal_value": deal_value,
+		}
+	]
+
+	if doc.closed_date:
+		closed_on = datetime.combine(getdate(doc.closed_date), time())
+		rows.append(
+			{
+				**dimensions,
+				"date": getdate(doc.closed_date),
+				"date_basis": "Closed",
+				"record_count": 1,
+				"deal_value": deal_value,
+				"days_to_close": get_days_between(doc.creation, closed_on),
+				"lead_days_to_close": get_days_between(lead_creation or doc.creation, closed_on),
+			}
+		)
+
+	if doc.expected_closure_date:
+		expected_value = flt(doc.expected_deal_value) * exchange_rate
+		rows.append(
+			{
+				**dimensions,
+				"date": getdate(doc.expected_closure_date),
+				"date_basis": "Expected Closure",
+				"record_count": 1,
+				"deal_value": deal_value,
+				"expected_value": expected_value,
+				"weighted_value": expected_value * flt(doc.probability) / 100,
+			}
+		)
+
+	return rows
+
+
+def get_days_between(from_datetime, to_datetime):
+	# whole days, truncated towards zero like TIMESTAMPDIFF(DAY, ...)
+	return int((get_datetime(to_datetime) - get_datetime(from_datetime)).total_seconds() / 86400)
+
+
+def get_rollup_name(dimensions):
+	key = "|".join(str(dimensions.get(dimension) or "") for dimension in ROLLUP_DIMENSIONS)
+	return hashlib.md5(key.encode()).hexdigest()
+
+
+def add_to_rollup_row(dimensions, delta):
+	values = {**dimensions, **delta, "name": get_rollup_name(dimensions), "now": now()}
+	columns = ROLLUP_DIMENSIONS + ROLLUP_MEASURES
+
+	frappe.db.sql(
+		f"""
+		INSERT INTO `tabCRM Dashboard Rollup`
+			(name, creation, modified, owner, modified_by, {", ".join(f"`{c}`" for c in columns)})
+		VALUES
+			(%(name)s, %(now)s, %(now)s, 'Administrator', 'Administrator',
+			{", ".join(f"%({c})s" for c in columns)})
+		ON DUPLICATE KEY UPDATE
+			modified = VALUES(modified),
+			{", ".join(f"`{m}` = `{m}` + VALUES(`{m}`)" for m in ROLLUP_MEASURES)}
+		""",
+		values,
+	)
+
+
+def rebuild_dashboard_rollup():
+	"""Recompute the whole rollup from CRM Lead & CRM Deal. Runs nightly to repair any drift."""
+	frappe.db.delete("CRM Dashboard Rollup")
+
+	columns = ", ".join(["name", "creation", "modified", "owner", "modified_by", *ROLLUP_DIMENSIONS])
+	columns += ", " + ", ".join(ROLLUP_MEASURES)
+
+	def insert_grouped(date_expr, date_basis, doctype, owner, lost_reason, measures, from_, where=""):
+		dimensions = [
+			date_expr,
+			f"'{date_basis}'",
+			f"'{doctype}'",
+			f"IFNULL({owner}, '')",
+			"IFNULL(r.status, '')",
+			"IFNULL(r.source, '')",
+			"IFNULL(r.territory, '')",
+			f"IFNULL({lost_reason}, '')",
+		]
+		frappe.db.sql(
+			f"""
+			INSERT INTO `tabCRM Dashboard Rollup` ({columns})
+			SELECT
+				MD5(CONCAT_WS('|', {", ".join(dimensions)})),
+				NOW(), NOW(), 'Administrator', 'Administrator',
+				{", ".join(dimensions)},
+				{", ".join(measures)}
+			FROM {from_}
+			{where}
+			GROUP BY {", ".join(dimensions[:1] + dimensions[3:])}
+			"""
+		)
+
+	# an unset rate is stored as 0 and counts as 1, like in get_rollup_rows
+	exchange_rate = "COALESCE(NULLIF(r.exchange_rate, 0), 1)"
+	deal_value = f"SUM(r.deal_value * {exchange_rate})"
+	expected_value = f"SUM(r.expected_deal_value * {exchange_rate})"
+
+	insert_grouped(
+		"DATE(r.creation)",
+		"Created",
+		"CRM Lead",
+		"r.lead_owner",
+		"NULL",
+		["COUNT(*)", "0", "0", "0", "0", "0"],
+		"`tabCRM Lead` r",
+	)
+	insert_grouped(
+		"DATE(r.creation)",
+		"Created",
+		"CRM Deal",
+		"r.deal_owner",
+		"r.lost_reason",
+		["COUNT(*)", deal_value, "0", "0", "0", "0"],
+		"`tabCRM Deal` r",
+	)
+	insert_grouped(
+		"r.closed_date",
+		"Closed",
+		"CRM Deal",
+		"r.deal_owner",
+		"r.lost_reason",
+		[
+			"COUNT(*)",
+			deal_value,
+			"0",
+			"0",
+			"SUM(TIMESTAMPDIFF(DAY, r.creation, r.closed_date))",
+			"SUM(TIMESTAMPDIFF(DAY, COALESCE(l.creation, r.creation), r.closed_date))",
+		],
+		"`tabCRM Deal` r LEFT JOIN `tabCRM Lead` l ON r.lead = l.name",
+		"WHERE r.closed_date IS NOT NULL",
+	)
+	insert_grouped(
+		"r.expected_closure_date",
+		"Expected Closure",
+		"CRM Deal",
+		"r.deal_owner",
+		"r.lost_reason",
+		[
+			"COUNT(*)",
+			deal_value,
+			expected_value,
+			f"SUM(r.expected_deal_value * IFNULL(r.probability, 0) / 100 * {exchange_rate})",
+			"0",
+			"0",
+		],
+		"`tabCRM Deal` r",
+		"WHERE r.expected_closure_date IS NOT NULL",
+	)
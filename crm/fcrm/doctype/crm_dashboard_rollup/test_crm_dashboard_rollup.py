@@ -0,0 +1,46 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests import IntegrationTestCase
+from frappe.utils import flt
+
+from crm.fcrm.doctype.crm_dashboard_rollup.crm_dashboard_rollup import (
+	ROLLUP_DIMENSIONS,
+	ROLLUP_MEASURES,
+	rebuild_dashboard_rollup,
+)
+
+
+class TestCRMDashboardRollup(IntegrationTestCase):
+	def test_incremental_updates_match_rebuild(self):
+		first_lead = frappe.get_doc({"doctype": "CRM Lead", "first_name": "Rollup A"}).insert()
+		second_lead = frappe.get_doc({"doctype": "CRM Lead", "first_name": "Rollup B"}).insert()
+		frappe.db.set_value("CRM Lead", second_lead.name, "creation", "2025-01-01 10:00:00")
+
+		deal = frappe.get_doc(
+			{"doctype": "CRM Deal", "lead": first_lead.name, "deal_value": 1000, "closed_date": "2026-02-01"}
+		).insert()
+		# an unset rate, stored as 0 in the Float column
+		frappe.db.set_value("CRM Deal", deal.name, "exchange_rate", 0)
+		rebuild_dashboard_rollup()
+
+		deal = frappe.get_doc("CRM Deal", deal.name)
+		deal.lead = second_lead.name
+		deal.deal_value = 1500
+		deal.save()
+		first_lead.delete()
+
+		incremental = get_rollup_snapshot()
+		rebuild_dashboard_rollup()
+		self.assertEqual(incremental, get_rollup_snapshot())
+
+
+def get_rollup_snapshot():
+	"""Non-empty rollup rows keyed by their dimensions, rows left at zero by the hooks are skipped."""
+	snapshot = {}
+	for row in frappe.get_all("CRM Dashboard Rollup", fields=ROLLUP_DIMENSIONS + ROLLUP_MEASURES):
+		measures = tuple(flt(row[measure], 2) for measure in ROLLUP_MEASURES)
+		if any(measures):
+			snapshot[tuple(str(row[dimension]) for dimension in ROLLUP_DIMENSIONS)] = measures
+	return snapshot
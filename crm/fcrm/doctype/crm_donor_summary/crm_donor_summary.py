@@ -0,0 +1,71 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class CRMDonorSummary(Document):
+	pass
+
+
+def update_donor_summary(doc, method=None):
+	"""Doc event for Donation on_submit/on_cancel: recompute the summaries of its donors."""
+	donors = {row.donor for row in doc.get("payment_detail") or [] if row.donor}
+	if donors:
+		rebuild_donor_summary(donors)
+
+
+def rebuild_donor_summary(donors=None):
+	"""
+	Recompute the summary of `donors`, or of every donor, from their submitted donations in a
+	single grouped scan of Payment Detail.
+	"""
+	donor_condition = ""
+	if donors is not None:
+		donor_condition = "AND pd.donor IN %(donors)s"
+		frappe.db.delete("CRM Donor Summary", {"donor": ["in", list(donors)]})
+	else:
+		frappe.db.delete("CRM Donor Summary")
+
+	frappe.db.sql(
+		f"""
+		INSERT INTO `tabCRM Donor Summary`
+			(name, creation, modified, owner, modified_by, donor, last_donation_date,
+			lifetime_total, donation_count, last_campaign, last_fund_class)
+		SELECT
+			donor, NOW(), NOW(), 'Administrator', 'Administrator', donor, MAX(due_date),
+			SUM(IFNULL(donation_amount, 0)), COUNT(DISTINCT donation),
+			MAX(CASE WHEN recency = 1 THEN campaign END),
+			MAX(CASE WHEN recency = 1 THEN fund_class END)
+		FROM (
+			SELECT
+				pd.donor, pd.donation_amount, pd.fund_class,
+				dn.name AS donation, dn.due_date, dn.campaign,
+				ROW_NUMBER() OVER (
+					PARTITION BY pd.donor ORDER BY dn.due_date DESC, dn.name DESC, pd.idx
+				) AS recency
+			FROM `tabPayment Detail` pd
+			JOIN `tabDonation` dn ON dn.name = pd.parent AND dn.docstatus = 1
+			WHERE pd.donor IS NOT NULL {donor_condition}
+		) donations
+		GROUP BY donor
+		""",
+		{"donors": list(donors or [])},
+	)
+
+
+def enqueue_donor_summary_rebuild():
+	frappe.enqueue(
+		rebuild_donor_summary,
+		queue="long",
+		timeout=60 * 60,
+		job_id="crm_donor_summary_rebuild",
+		deduplicate=True,
+	)
+
+
+def add_donor_summary_indexes():
+	# summaries of a donation's donors are recomputed on submit/cancel
+	if frappe.db.table_exists("Payment Detail"):
+		frappe.db.add_index("Payment Detail", ["donor"])
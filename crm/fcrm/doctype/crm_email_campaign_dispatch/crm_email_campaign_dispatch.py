@@ -0,0 +1,115 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import now
+
+STATE_FIELDS = [
+	"name",
+	"email_campaign",
+	"status",
+	"started_at",
+	"total",
+	"sent",
+	"cursor",
+	"chunks",
+	"dispatched",
+	"pending_chunks",
+]
+
+
+class CRMEmailCampaignDispatch(Document):
+	pass
+
+
+def get_dispatch_name(email_campaign, schedule):
+	return f"{email_campaign}-{schedule}"
+
+
+def start_dispatch(email_campaign, schedule, total):
+	"""
+	Checkpoint of sending `schedule` of `email_campaign`. An unfinished run is resumed, a completed
+	one is started over.
+	"""
+	name = get_dispatch_name(email_campaign, schedule)
+	if not frappe.db.exists("CRM Email Campaign Dispatch", name):
+		frappe.get_doc(
+			{
+				"doctype": "CRM Email Campaign Dispatch",
+				"email_campaign": email_campaign,
+				"schedule": schedule,
+				"total": total,
+				"started_at": now(),
+			}
+		).insert(ignore_permissions=True)
+	elif get_dispatch_state(name, for_update=True).status == "Completed":
+		set_dispatch_state(
+			name,
+			status="In Progress",
+			started_at=now(),
+			total=total,
+			sent=0,
+			cursor=None,
+			chunks=0,
+			dispatched=0,
+			pending_chunks={},
+		)
+	else:
+		set_dispatch_state(name, dispatched=0)
+
+	frappe.db.commit()
+	return get_dispatch_state(name)
+
+
+def get_dispatch_state(name, for_update=False):
+	state = frappe.db.get_value(
+		"CRM Email Campaign Dispatch", name, STATE_FIELDS, as_dict=True, for_update=for_update
+	)
+	if state:
+		pending_chunks = frappe.parse_json(state.pending_chunks or "{}")
+		state.pending_chunks = {int(chunk_id): chunk for chunk_id, chunk in pending_chunks.items()}
+	return state
+
+
+def set_dispatch_state(name, **values):
+	if "pending_chunks" in values:
+		values["pending_chunks"] = frappe.as_json(values["pending_chunks"])
+	frappe.db.set_value("CRM Email Campaign Dispatch", name, values, update_modified=False)
+
+
+def add_pending_chunk(name, after, last):
+	"""Record the chunk of members after `after` up to `last` as pending and commit, returns its id."""
+	state = get_dispatch_state(name, for_update=True)
+	chunk_id = state.chunks + 1
+	state.pending_chunks[chunk_id] = [after, last]
+	set_dispatch_state(name, chunks=chunk_id, cursor=last, pending_chunks=state.pending_chunks)
+	frappe.db.commit()
+	return chunk_id
+
+
+def complete_chunk(name, chunk_id, sent):
+	"""Mark the chunk as sent, in the same transaction as the emails it queued."""
+	state = get_dispatch_state(name, for_update=True)
+	if state.pending_chunks.pop(chunk_id, None) is not None:
+		state.sent += sent
+		set_dispatch_state(name, sent=state.sent, pending_chunks=state.pending_chunks)
+	return state
+
+
+def mark_dispatched(name):
+	set_dispatch_state(name, dispatched=1)
+	frappe.db.commit()
+
+
+def complete_dispatch(name):
+	"""
+	Complete the run once every chunk was queued and sent. Returns the final state to the one
+	caller that completed it, None to everyone else. The caller commits.
+	"""
+	state = get_dispatch_state(name, for_update=True)
+	if not state or state.status == "Completed" or not state.dispatched or state.pending_chunks:
+		return None
+
+	set_dispatch_state(name, status="Completed")
+	return state
@@ -0,0 +1,144 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import threading
+from collections import OrderedDict
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import flt, getdate
+from redis.exceptions import LockError
+
+RATE_CACHE_SIZE = 1024
+RATE_CACHE_TTL = 24 * 60 * 60
+DEFAULT_PROVIDER = "crm.fcrm.doctype.fcrm_settings.fcrm_settings.fetch_exchange_rate"
+
+# in-process LRU of (site, from, to, date) -> rate
+_rates = OrderedDict()
+_rates_lock = threading.Lock()
+
+
+class CRMExchangeRate(Document):
+	def on_update(self):
+		forget_exchange_rate(self.from_currency, self.to_currency, self.date)
+
+	def on_trash(self):
+		forget_exchange_rate(self.from_currency, self.to_currency, self.date)
+
+
+class StaticExchangeRateProvider:
+	"""
+	Provider answering from a fixed `{(from_currency, to_currency): rate}` map, for tests:
+
+	frappe.flags.crm_exchange_rate_provider = StaticExchangeRateProvider({("USD", "PKR"): 280})
+	"""
+
+	def __init__(self, rates):
+		self.rates = rates
+		self.calls = []
+
+	def __call__(self, from_currency, to_currency, date=None):
+		self.calls.append((from_currency, to_currency, date))
+		return self.rates.get((from_currency, to_currency))
+
+
+def get_cached_exchange_rate(from_currency, to_currency, date=None, provider=None):
+	"""
+	Exchange rate from `from_currency` to `to_currency` on `date` (today by default).
+
+	Rates are looked up in an in-process LRU, then redis, then CRM Exchange Rate, and only
+	then asked from the provider. Concurrent misses for the same pair and day wait on a lock
+	so a single provider call is made.
+
+	:param provider: Callable `(from_currency, to_currency, date) -> rate`, defaults to the
+	        FCRM Settings provider. `frappe.flags.crm_exchange_rate_provider` overrides it.
+	"""
+	if from_currency == to_currency:
+		return 1
+
+	date = getdate(date)
+	local_key = (frappe.local.site, from_currency, to_currency, date)
+	if rate := get_local_rate(local_key):
+		return rate
+
+	cache_key = f"crm_exchange_rate:{from_currency}:{to_currency}:{date}"
+	rate = frappe.cache.get_value(cache_key) or get_stored_rate(from_currency, to_currency, date)
+	if not rate:
+		provider = frappe.flags.crm_exchange_rate_provider or provider or frappe.get_attr(DEFAULT_PROVIDER)
+		lock = frappe.cache.lock(frappe.cache.make_key(f"{cache_key}:lock"), timeout=30, blocking_timeout=30)
+		try:
+			with lock:
+				rate = fetch_rate(from_currency, to_currency, date, provider)
+		except LockError:
+			# the lock holder is stuck on a slow provider, ask it directly instead of failing
+			rate = fetch_rate(from_currency, to_currency, date, provider)
+
+	if rate:
+		set_local_rate(local_key, rate)
+	return rate
+
+
+def fetch_rate(from_currency, to_currency, date, provider):
+	cache_key = f"crm_exchange_rate:{from_currency}:{to_currency}:{date}"
+	rate = frappe.cache.get_value(cache_key) or get_stored_rate(from_currency, to_currency, date)
+	if not rate:
+		rate = flt(provider(from_currency, to_currency, str(date)))
+		if rate:
+			store_rate(from_currency, to_currency, date, rate)
+	if rate:
+		frappe.cache.set_value(cache_key, rate, expires_in_sec=RATE_CACHE_TTL)
+	return rate
+
+
+def get_local_rate(key):
+	with _rates_lock:
+		rate = _rates.get(key)
+		if rate:
+			_rates.move_to_end(key)
+		return rate
+
+
+def set_local_rate(key, rate):
+	with _rates_lock:
+		_rates[key] = rate
+		_rates.move_to_end(key)
+		if len(_rates) > RATE_CACHE_SIZE:
+			_rates.popitem(last=False)
+
+
+def get_stored_rate(from_currency, to_currency, date):
+	return frappe.db.get_value(
+		"CRM Exchange Rate",
+		{"from_currency": from_currency, "to_currency": to_currency, "date": date},
+		"rate",
+	)
+
+
+def store_rate(from_currency, to_currency, date, rate):
+	try:
+		frappe.get_doc(
+			{
+				"doctype": "CRM Exchange Rate",
+				"from_currency": from_currency,
+				"to_currency": to_currency,
+				# autoname only formats str values into the name
+				"date": str(getdate(date)),
+				"rate": rate,
+			}
+		).insert(ignore_permissions=True)
+	except frappe.DuplicateEntryError:
+		# stored concurrently by another worker
+		if not get_stored_rate(from_currency, to_currency, date):
+			raise
+
+
+def forget_exchange_rate(from_currency, to_currency, date):
+	date = getdate(date)
+	frappe.cache.delete_value(f"crm_exchange_rate:{from_currency}:{to_currency}:{date}")
+	with _rates_lock:
+		_rates.pop((frappe.local.site, from_currency, to_currency, date), None)
+
+
+def clear_local_rates():
+	with _rates_lock:
+		_rates.clear()
@@ -0,0 +1,50 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests import IntegrationTestCase
+
+from crm.fcrm.doctype.crm_exchange_rate.crm_exchange_rate import (
+	StaticExchangeRateProvider,
+	clear_local_rates,
+	forget_exchange_rate,
+	get_cached_exchange_rate,
+)
+
+
+class TestCRMExchangeRate(IntegrationTestCase):
+	def setUp(self):
+		self.provider = StaticExchangeRateProvider({("USD", "INR"): 83.5})
+		frappe.flags.crm_exchange_rate_provider = self.provider
+		frappe.db.delete("CRM Exchange Rate", {"from_currency": "USD", "to_currency": "INR"})
+		forget_exchange_rate("USD", "INR", "2026-01-05")
+		forget_exchange_rate("USD", "INR", "2026-01-06")
+
+	def tearDown(self):
+		frappe.flags.crm_exchange_rate_provider = None
+
+	def test_one_lookup_per_pair_and_day(self):
+		for _i in range(5):
+			self.assertEqual(get_cached_exchange_rate("USD", "INR", "2026-01-05"), 83.5)
+		self.assertEqual(len(self.provider.calls), 1)
+
+	def test_rate_is_persisted(self):
+		get_cached_exchange_rate("USD", "INR", "2026-01-05")
+		forget_exchange_rate("USD", "INR", "2026-01-05")
+		clear_local_rates()
+
+		self.assertEqual(get_cached_exchange_rate("USD", "INR", "2026-01-05"), 83.5)
+		self.assertEqual(len(self.provider.calls), 1)
+		self.assertTrue(frappe.db.exists("CRM Exchange Rate", "USD-INR-2026-01-05"))
+
+	def test_one_row_per_day(self):
+		get_cached_exchange_rate("USD", "INR", "2026-01-05")
+		get_cached_exchange_rate("USD", "INR", "2026-01-06")
+
+		self.assertEqual(len(self.provider.calls), 2)
+		self.assertTrue(frappe.db.exists("CRM Exchange Rate", "USD-INR-2026-01-05"))
+		self.assertTrue(frappe.db.exists("CRM Exchange Rate", "USD-INR-2026-01-06"))
+
+	def test_same_currency(self):
+		self.assertEqual(get_cached_exchange_rate("INR", "INR"), 1)
+		self.assertEqual(self.provider.calls, [])
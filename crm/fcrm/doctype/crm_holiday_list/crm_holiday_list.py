@@ -1,9 +1,40 @@
 # Copyright (c) 2023, Frappe Technologies Pvt. Ltd. and contributors
 # For license information, please see license.txt
 
-# import frappe
+import frappe
 from frappe.model.document import Document
 
+from crm.fcrm.doctype.crm_service_level_agreement.utils import clear_sla_cache
+
+HOLIDAY_DATES_CACHE_KEY = "crm_holiday_dates"
+
 
 class CRMHolidayList(Document):
-	pass
+	def on_update(self):
+		clear_holiday_cache()
+		clear_sla_cache()
+
+	def on_trash(self):
+		clear_holiday_cache()
+		clear_sla_cache()
+
+
+def get_holiday_dates(holiday_list: str | None) -> frozenset:
+	"""Dates of a holiday list as a set, cached until a holiday list changes."""
+	if not holiday_list:
+		return frozenset()
+
+	def load_dates():
+		return frozenset(
+			frappe.get_all(
+				"CRM Holiday",
+				filters={"parent": holiday_list, "parenttype": "CRM Holiday List"},
+				pluck="date",
+			)
+		)
+
+	return frappe.cache.hget(HOLIDAY_DATES_CACHE_KEY, holiday_list, load_dates)
+
+
+def clear_holiday_cache():
+	frappe.cache.delete_value(HOLIDAY_DATES_CACHE_KEY)
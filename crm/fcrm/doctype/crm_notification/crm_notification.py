@@ -11,6 +11,12 @@ class CRMNotification(Document):
 		if self.to_user:
 			frappe.publish_realtime("crm_notification", user= self.to_user)
 
+
+def on_doctype_update():
+	frappe.db.add_index("CRM Notification", ["to_user", "read"])
+	frappe.db.add_index("CRM Notification", ["to_user", "creation"])
+
+
 def notify_user(args):
 	"""
 	Notify the assigned user
@@ -0,0 +1,146 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+from crm.utils import normalize_phone_number
+
+# phone fields indexed per doctype, Contact also indexes its `phone_nos` table
+PHONE_INDEX_FIELDS = {
+	"Contact": ["mobile_no", "phone"],
+	"CRM Lead": ["mobile_no", "phone"],
+	"CRM Deal": ["mobile_no", "phone"],
+	"Donor": ["mobile_no", "phone"],
+}
+REBUILD_BATCH_SIZE = 5000
+
+
+class CRMPhoneIndex(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_index("CRM Phone Index", ["phone", "reference_doctype"])
+	frappe.db.add_index("CRM Phone Index", ["reference_doctype", "reference_name"])
+
+
+def update_phone_index(doc, method=None):
+	"""Doc event for Contact, CRM Lead, CRM Deal & Donor: keep the document's index rows in sync."""
+	phones = set() if method == "on_trash" else get_indexed_phones(doc)
+	indexed = set(
+		frappe.get_all(
+			"CRM Phone Index",
+			filters={"reference_doctype": doc.doctype, "reference_name": doc.name},
+			pluck="phone",
+		)
+	)
+	if phones == indexed:
+		return
+
+	frappe.db.delete("CRM Phone Index", {"reference_doctype": doc.doctype, "reference_name": doc.name})
+	insert_index_rows([(phone, doc.doctype, doc.name) for phone in phones])
+
+
+def get_indexed_phones(doc):
+	numbers = [doc.get(fieldname) for fieldname in PHONE_INDEX_FIELDS[doc.doctype]]
+	if doc.doctype == "Contact":
+		numbers.extend(row.phone for row in doc.get("phone_nos") or [])
+
+	return {phone for number in numbers if (phone := normalize_phone_number(number))}
+
+
+def insert_index_rows(rows):
+	if not rows:
+		return
+
+	now = frappe.utils.now()
+	frappe.db.bulk_insert(
+		"CRM Phone Index",
+		[
+			"name",
+			"creation",
+			"modified",
+			"owner",
+			"modified_by",
+			"phone",
+			"reference_doctype",
+			"reference_name",
+		],
+		[
+			(frappe.generate_hash(length=10), now, now, "Administrator", "Administrator", *row)
+			for row in rows
+		],
+	)
+
+
+def find_by_phone(phone, doctype):
+	"""Names of `doctype` records having the E.164 number `phone`."""
+	return frappe.get_all(
+		"CRM Phone Index",
+		filters={"phone": phone, "reference_doctype": doctype},
+		pluck="reference_name",
+	)
+
+
+def rebuild_phone_index():
+	"""
+	Rebuild the whole index, reading every doctype in batches. Each batch replaces its own rows
+	in one transaction, so lookups keep working while the rebuild runs.
+	"""
+	for doctype, fields in PHONE_INDEX_FIELDS.items():
+		last_name = None
+		while True:
+			filters = {"name": [">", last_name]} if last_name else {}
+			records = frappe.get_all(
+				doctype,
+				filters=filters,
+				fields=["name", *fields],
+				order_by="name asc",
+				limit=REBUILD_BATCH_SIZE,
+			)
+			if not records:
+				break
+
+			numbers = {r.name: [r.get(fieldname) for fieldname in fields] for r in records}
+			if doctype == "Contact":
+				for row in frappe.get_all(
+					"Contact Phone",
+					filters={"parenttype": "Contact", "parent": ["in", list(numbers)]},
+					fields=["parent", "phone"],
+				):
+					numbers[row.parent].append(row.phone)
+
+			frappe.db.delete(
+				"CRM Phone Index", {"reference_doctype": doctype, "reference_name": ["in", list(numbers)]}
+			)
+			insert_index_rows(
+				[
+					(phone, doctype, name)
+					for name, values in numbers.items()
+					for phone in {normalize_phone_number(number) for number in values} - {None}
+				]
+			)
+			frappe.db.commit()
+			last_name = records[-1].name
+
+		# rows of records deleted without their doc event
+		frappe.db.sql(
+			f"""
+			DELETE i FROM `tabCRM Phone Index` i
+			LEFT JOIN `tab{doctype}` d ON d.name = i.reference_name
+			WHERE i.reference_doctype = %s AND d.name IS NULL
+			""",
+			doctype,
+		)
+		frappe.db.commit()
+
+
+def enqueue_phone_index_rebuild():
+	frappe.enqueue(
+		rebuild_phone_index,
+		queue="long",
+		timeout=3 * 60 * 60,
+		job_id="crm_phone_index_rebuild",
+		deduplicate=True,
+	)
@@ -0,0 +1,38 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests import IntegrationTestCase
+
+from crm.integrations.api import get_contacts_by_phone_numbers
+from crm.utils import normalize_phone_number
+
+
+class TestCRMPhoneIndex(IntegrationTestCase):
+	def get_indexed_phones(self, lead):
+		return frappe.get_all(
+			"CRM Phone Index",
+			filters={"reference_doctype": "CRM Lead", "reference_name": lead},
+			pluck="phone",
+		)
+
+	def test_index_follows_lead(self):
+		lead = frappe.get_doc(
+			{"doctype": "CRM Lead", "first_name": "Index", "mobile_no": "3001234567"}
+		).insert()
+		self.assertEqual(self.get_indexed_phones(lead.name), [normalize_phone_number("3001234567")])
+
+		lead.mobile_no = "3007654321"
+		lead.save()
+		self.assertEqual(self.get_indexed_phones(lead.name), [normalize_phone_number("3007654321")])
+
+		lead.delete()
+		self.assertEqual(self.get_indexed_phones(lead.name), [])
+
+	def test_national_number_finds_its_lead(self):
+		lead = frappe.get_doc(
+			{"doctype": "CRM Lead", "first_name": "Caller", "mobile_no": "3001234568"}
+		).insert()
+
+		caller = get_contacts_by_phone_numbers(["3001234568"])["3001234568"]
+		self.assertEqual(caller.get("name"), lead.name)
@@ -3,17 +3,15 @@
 
 import frappe
 from frappe import _
-from datetime import timedelta
+from datetime import datetime, time, timedelta
 from frappe.model.document import Document
 from frappe.utils import (
-	add_to_date,
 	get_datetime,
 	get_weekdays,
-	getdate,
 	now_datetime,
-	time_diff_in_seconds,
 )
-from crm.fcrm.doctype.crm_service_level_agreement.utils import get_context
+from crm.fcrm.doctype.crm_holiday_list.crm_holiday_list import get_holiday_dates
+from crm.fcrm.doctype.crm_service_level_agreement.utils import clear_sla_cache, get_context
 
 
 class CRMServiceLevelAgreement(Document):
@@ -21,6 +19,12 @@ class CRMServiceLevelAgreement(Document):
 		self.validate_default()
 		self.validate_condition()
 
+	def on_update(self):
+		clear_sla_cache()
+
+	def on_trash(self):
+		clear_sla_cache()
+
 	def validate_default(self):
 		if self.default:
 			other_slas = frappe.get_all(
@@ -112,34 +116,14 @@ class CRMServiceLevelAgreement(Document):
 		start_at: str,
 		duration_seconds: int,
 	):
-		res = get_datetime(start_at)
-		time_needed = duration_seconds
-		holidays = self.get_holidays()
-		weekdays = get_weekdays()
-		workdays = self.get_workdays()
-		while time_needed:
-			today = res
-			today_day = getdate(today)
-			today_weekday = weekdays[today.weekday()]
-			is_workday = today_weekday in workdays
-			is_holiday = today_day in holidays
-			if is_holiday or not is_workday:
-				res = add_to_date(res, days=1, as_datetime=True)
-				continue
-			today_workday = workdays[today_weekday]
-			now_in_seconds = time_diff_in_seconds(today, today_day)
-			start_time = max(today_workday.start_time.total_seconds(), now_in_seconds)
-			till_start_time = max(start_time - now_in_seconds, 0)
-			end_time = max(today_workday.end_time.total_seconds(), now_in_seconds)
-			time_left = max(end_time - start_time, 0)
-			if not time_left:
-				res = getdate(add_to_date(res, days=1, as_datetime=True))
-				continue
-			time_taken = min(time_needed, time_left)
-			time_needed -= time_taken
-			time_required = till_start_time + time_taken
-			res = add_to_date(res, seconds=time_required, as_datetime=True)
-		return res
+		"""
+		Get the time at which `duration_seconds` of working time have passed since `start_at`
+
+		:param start_at: Date at which calculation starts
+		:param duration_seconds: Working time to add, in seconds
+		:return: Target datetime, None if the SLA has no working hours
+		"""
+		return self.get_calendar().add_working_seconds(get_datetime(start_at), duration_seconds)
 
 	def calc_elapsed_time(self, start_time, end_time) -> float:
 		"""
@@ -149,25 +133,7 @@ class CRMServiceLevelAgreement(Document):
 		:param end_at: Date at which calculation ends
 		:return: Number of seconds
 		"""
-		start_time = get_datetime(start_time)
-		end_time = get_datetime(end_time)
-		holiday_list = []
-		working_day_list = self.get_working_days()
-		working_hours = self.get_working_hours()
-
-		total_seconds = 0
-		current_time = start_time
-
-		while current_time < end_time:
-			in_holiday_list = current_time.date() in holiday_list
-			not_in_working_day_list = get_weekdays()[current_time.weekday()] not in working_day_list
-			if in_holiday_list or not_in_working_day_list or not self.is_working_time(current_time, working_hours):
-				current_time += timedelta(seconds=1)
-				continue
-			total_seconds += 1
-			current_time += timedelta(seconds=1)
-
-		return total_seconds
+		return self.get_calendar().get_working_seconds(get_datetime(start_time), get_datetime(end_time))
 
 	def get_priorities(self):
 		"""
@@ -188,38 +154,101 @@ class CRMServiceLevelAgreement(Document):
 
 		return self.priorities[0].priority
 
-	def get_workdays(self) -> dict[str, dict]:
-		"""
-		Return workdays related info as a dict. With `workday` as key
-		"""
-		res = {}
-		for row in self.working_hours:
-			res[row.workday] = row
-		return res
-
-	def get_working_days(self) -> dict[str, dict]:
-		workdays = []
-		for row in self.working_hours:
-			workdays.append(row.workday)
-		return workdays
-
 	def get_working_hours(self) -> dict[str, dict]:
 		res = {}
 		for row in self.working_hours:
 			res[row.workday] = (row.start_time, row.end_time)
 		return res
 
-	def is_working_time(self, date_time, working_hours):
-		day_of_week = get_weekdays()[date_time.weekday()]
-		start_time, end_time = working_hours.get(day_of_week, (0, 0))
-		date_time = timedelta(hours=date_time.hour, minutes=date_time.minute, seconds=date_time.second)
-		return start_time <= date_time < end_time
-
-	def get_holidays(self):
-		res = []
-		if not self.holiday_list:
-			return res
-		holiday_list = frappe.get_doc("CRM Holiday List", self.holiday_list)
-		for row in holiday_list.holidays:
-			res.append(row.date)
-		return res
+	def get_weekday_hours(self) -> dict[int, tuple[timedelta, timedelta]]:
+		"""
+		Return working hours as a dict with the weekday number (Monday is 0) as key
+		"""
+		weekdays = get_weekdays()
+		return {weekdays.index(workday): hours for workday, hours in self.get_working_hours().items()}
+
+	def get_holidays(self) -> frozenset:
+		return get_holiday_dates(self.holiday_list)
+
+	def get_calendar(self) -> "BusinessCalendar":
+		return BusinessCalendar(self.get_weekday_hours(), self.get_holidays())
+
+
+class BusinessCalendar:
+	"""
+	Working hours per weekday and holidays of an SLA, answering calendar questions without
+	walking time.
+	"""
+
+	def __init__(self, weekday_hours: dict[int, tuple[timedelta, timedelta]], holidays: frozenset):
+		# only weekdays that have working time, so days without any can be skipped at once
+		self.weekday_hours = {
+			weekday: (start_time, end_time)
+			for weekday, (start_time, end_time) in weekday_hours.items()
+			if end_time > start_time
+		}
+		self.holidays = holidays
+
+	def is_holiday(self, day) -> bool:
+		return day in self.holidays
+
+	def is_working_day(self, day) -> bool:
+		return day.weekday() in self.weekday_hours and not self.is_holiday(day)
+
+	def get_working_seconds(self, start, end) -> float:
+		return get_working_seconds(start, end, self.weekday_hours, self.holidays)
+
+	def add_working_seconds(self, start, seconds):
+		return add_working_seconds(start, seconds, self.weekday_hours, self.holidays)
+
+
+def get_working_seconds(start, end, weekday_hours, holidays) -> float:
+	"""
+	Working seconds between `start` and `end`, summing the overlap of [start, end) with the
+	working hours of each day in between.
+
+	:param weekday_hours: Working hours as `{weekday: (start_time, end_time)}`, times as timedelta
+	:param holidays: Set of holiday dates
+	"""
+	total = 0.0
+	for segment_start, segment_end in iter_working_segments(start.date(), weekday_hours, holidays):
+		if segment_start >= end:
+			break
+		overlap = min(segment_end, end) - max(segment_start, start)
+		total += max(overlap.total_seconds(), 0)
+	return total
+
+
+def add_working_seconds(start, seconds, weekday_hours, holidays):
+	"""
+	Datetime at which `seconds` of working time have passed since `start`, None if there are no
+	working hours at all.
+	"""
+	if not seconds:
+		return start
+
+	if not any(end_time > start_time for start_time, end_time in weekday_hours.values()):
+		return None
+
+	for segment_start, segment_end in iter_working_segments(start.date(), weekday_hours, holidays):
+		segment_start = max(segment_start, start)
+		available = (segment_end - segment_start).total_seconds()
+		if available <= 0:
+			continue
+		if seconds <= available:
+			return segment_start + timedelta(seconds=seconds)
+		seconds -= available
+
+
+def iter_working_segments(from_date, weekday_hours, holidays):
+	"""Yield the (start, end) working period of every working day from `from_date` on, in order."""
+	if not any(end_time > start_time for start_time, end_time in weekday_hours.values()):
+		return
+
+	day = from_date
+	while True:
+		hours = weekday_hours.get(day.weekday())
+		if hours and hours[1] > hours[0] and day not in holidays:
+			midnight = datetime.combine(day, time())
+			yield midnight + hours[0], midnight + hours[1]
+		day += timedelta(days=1)
@@ -1,9 +1,78 @@
 # Copyright (c) 2023, Frappe Technologies Pvt. Ltd. and Contributors
 # See license.txt
 
-# import frappe
+import random
+from datetime import date, datetime, timedelta
+
 from frappe.tests import UnitTestCase
 
+from crm.fcrm.doctype.crm_service_level_agreement.crm_service_level_agreement import (
+	add_working_seconds,
+	get_working_seconds,
+)
+
+# every time in the tests is a multiple of STEP, so stepping by it is exact
+STEP = timedelta(minutes=15)
+
+
+def brute_force_working_seconds(start, end, weekday_hours, holidays):
+	"""The previous per-second loop, walking in STEPs to keep the test fast."""
+	total = 0
+	current = start
+	while current < end:
+		start_time, end_time = weekday_hours.get(current.weekday(), (timedelta(0), timedelta(0)))
+		time_of_day = timedelta(hours=current.hour, minutes=current.minute)
+		if current.date() not in holidays and start_time <= time_of_day < end_time:
+			total += STEP.total_seconds()
+		current += STEP
+	return total
+
+
+def random_calendar(rng):
+	weekday_hours = {}
+	for weekday in rng.sample(range(7), rng.randint(1, 7)):
+		start_minute = rng.randrange(0, 24 * 60, 15)
+		end_minute = rng.randrange(start_minute, 24 * 60 + 1, 15)
+		weekday_hours[weekday] = (timedelta(minutes=start_minute), timedelta(minutes=end_minute))
+
+	holidays = {date(2025, 1, 1) + timedelta(days=rng.randrange(21)) for _i in range(rng.randint(0, 5))}
+	return weekday_hours, holidays
+
+
+def random_datetime(rng):
+	return datetime(2025, 1, 1) + STEP * rng.randrange(14 * 24 * 4)
+
 
 class TestCRMServiceLevelAgreement(UnitTestCase):
-	pass
+	def test_working_seconds_match_brute_force(self):
+		rng = random.Random(7)
+		for _i in range(200):
+			weekday_hours, holidays = random_calendar(rng)
+			start, end = sorted([random_datetime(rng), random_datetime(rng)])
+			with self.subTest(start=start, end=end, weekday_hours=weekday_hours, holidays=holidays):
+				self.assertEqual(
+					get_working_seconds(start, end, weekday_hours, holidays),
+					brute_force_working_seconds(start, end, weekday_hours, holidays),
+				)
+
+	def test_add_working_seconds_reaches_duration(self):
+		rng = random.Random(11)
+		for _i in range(200):
+			weekday_hours, holidays = random_calendar(rng)
+			start = random_datetime(rng)
+			seconds = STEP.total_seconds() * rng.randrange(1, 3 * 24 * 4)
+			target = add_working_seconds(start, seconds, weekday_hours, holidays)
+			with self.subTest(start=start, seconds=seconds, weekday_hours=weekday_hours, holidays=holidays):
+				if target is None:
+					self.assertFalse(any(to_time > from_time for from_time, to_time in weekday_hours.values()))
+					continue
+				self.assertEqual(brute_force_working_seconds(start, target, weekday_hours, holidays), seconds)
+				# the target is the earliest such time
+				self.assertLess(
+					brute_force_working_seconds(start, target - STEP, weekday_hours, holidays), seconds
+				)
+
+	def test_no_working_hours(self):
+		start = datetime(2025, 1, 1, 10)
+		self.assertIsNone(add_working_seconds(start, 60, {}, set()))
+		self.assertEqual(get_working_seconds(start, start + timedelta(days=3), {}, set()), 0)
@@ -1,9 +1,15 @@
 import frappe
 from frappe.model.document import Document
-from frappe.query_builder import JoinType
 from frappe.utils.safe_exec import get_safe_globals
-from frappe.utils import now_datetime
-from pypika import Criterion
+from frappe.utils import get_datetime, now_datetime
+
+from crm.api.list_count import bump_count_cache_version
+
+SLA_RULES_CACHE_KEY = "crm_sla_rules"
+SLA_SWEEP_BATCH_SIZE = 1000
+# doctypes whose SLA status is swept, with the field holding the record owner
+SLA_DOCTYPES = {"CRM Lead": "lead_owner", "CRM Deal": "deal_owner", "Donor": "donor_owner"}
+
 
 def get_sla(doc: Document) -> Document:
 	"""
@@ -12,25 +18,15 @@ def get_sla(doc: Document) -> Document:
 	:param doc: Lead/Deal to use
 	:return: Applicable SLA
 	"""
-	SLA = frappe.qb.DocType("CRM Service Level Agreement")
-	Priority = frappe.qb.DocType("CRM Service Level Priority")
 	now = now_datetime()
 	priority = doc.communication_status
-	q = (
-		frappe.qb.from_(SLA)
-		.select(SLA.name, SLA.condition)
-		.where(SLA.apply_on == doc.doctype)
-		.where(SLA.enabled == True)
-		.where(Criterion.any([SLA.start_date.isnull(), SLA.start_date <= now]))
-		.where(Criterion.any([SLA.end_date.isnull(), SLA.end_date >= now]))
-	)
-	if priority:
-		q = (
-			q.join(Priority, JoinType.inner)
-			.on(Priority.parent == SLA.name)
-			.where(Priority.priority == priority)
-		)
-	sla_list = q.run(as_dict=True)
+	sla_list = [
+		sla
+		for sla in get_sla_rules(doc.doctype)
+		if (not sla.start_date or get_datetime(sla.start_date) <= now)
+		and (not sla.end_date or get_datetime(sla.end_date) >= now)
+		and (not priority or priority in sla.priorities)
+	]
 	res = None
 
 	# move default sla to the end of the list
@@ -40,13 +36,68 @@ def get_sla(doc: Document) -> Document:
 			sla_list.append(sla)
 			break
 
+	context = None
 	for sla in sla_list:
 		cond = sla.get("condition")
-		if not cond or frappe.safe_eval(cond, None, get_context(doc)):
+		if cond and context is None:
+			context = get_context(doc)
+		if not cond or frappe.safe_eval(cond, None, context):
 			res = sla
 			break
 	return res
 
+
+def get_sla_rules(doctype: str) -> list[dict]:
+	"""
+	Enabled SLAs of `doctype` with the priorities they cover, cached until an SLA or holiday
+	list changes.
+	"""
+
+	def load_rules():
+		SLA = frappe.qb.DocType("CRM Service Level Agreement")
+		Priority = frappe.qb.DocType("CRM Service Level Priority")
+		rows = (
+			frappe.qb.from_(SLA)
+			.left_join(Priority)
+			.on(Priority.parent == SLA.name)
+			.select(
+				SLA.name,
+				SLA.condition,
+				SLA.default,
+				SLA.start_date,
+				SLA.end_date,
+				Priority.priority,
+			)
+			.where(SLA.apply_on == doctype)
+			.where(SLA.enabled == True)
+			.orderby(SLA.creation)
+			.run(as_dict=True)
+		)
+
+		rules = {}
+		for row in rows:
+			rule = rules.setdefault(
+				row.name,
+				frappe._dict(
+					name=row.name,
+					condition=row.condition,
+					default=row.default,
+					start_date=row.start_date,
+					end_date=row.end_date,
+					priorities=[],
+				),
+			)
+			if row.priority:
+				rule.priorities.append(row.priority)
+		return list(rules.values())
+
+	return frappe.cache.hget(SLA_RULES_CACHE_KEY, doctype, load_rules)
+
+
+def clear_sla_cache():
+	frappe.cache.delete_value(SLA_RULES_CACHE_KEY)
+
+
 def get_context(d: Document) -> dict:
 	"""
 	Get safe context for `safe_eval`
@@ -58,4 +109,53 @@ def get_context(d: Document) -> dict:
 	return {
 		"doc": d.as_dict(),
 		"frappe": frappe._dict(utils=utils),
-	}
\ No newline at end of file
+	}
+
+
+def mark_failed_first_responses():
+	"""
+	Scheduled: set `sla_status` to Failed on records whose `response_by` has passed without a
+	first response, in chunked UPDATEs, and tell each owner once which records changed.
+	"""
+	now = now_datetime()
+	failed_by_user = {}
+
+	for doctype, owner_field in SLA_DOCTYPES.items():
+		table = frappe.qb.DocType(doctype)
+		last_name = None
+		while True:
+			query = (
+				frappe.qb.from_(table)
+				.select(table.name, table[owner_field])
+				.where(table.sla_status == "First Response Due")
+				.where(table.first_responded_on.isnull())
+				.where(table.response_by < now)
+				.orderby(table.name)
+				.limit(SLA_SWEEP_BATCH_SIZE)
+			)
+			if last_name:
+				query = query.where(table.name > last_name)
+
+			rows = query.run()
+			if not rows:
+				break
+
+			names = [row[0] for row in rows]
+			(
+				frappe.qb.update(table)
+				.set(table.sla_status, "Failed")
+				.where(table.name.isin(names))
+				.where(table.sla_status == "First Response Due")
+			).run()
+			frappe.db.commit()
+
+			for name, owner in rows:
+				if owner:
+					failed_by_user.setdefault(owner, {}).setdefault(doctype, []).append(name)
+			last_name = names[-1]
+
+		if last_name:
+			bump_count_cache_version(doctype)
+
+	for user, records in failed_by_user.items():
+		frappe.publish_realtime("crm_sla_failed", records, user=user)
@@ -2,6 +2,8 @@ import frappe
 from frappe.utils import get_link_to_form
 from erpnext.setup.utils import get_exchange_rate
 
+from crm.fcrm.doctype.crm_exchange_rate.crm_exchange_rate import get_cached_exchange_rate
+
 @frappe.whitelist()
 def get_donation(name):
     """Get donation details by name"""
@@ -195,25 +197,8 @@ def set_deduction_breakeven(payment_details, company, contribution_type, donatio
             if _breakeven:
                 return _breakeven
             
-            # Get deduction details from database (EXACT backend query)
-            result = frappe.db.sql(f"""
-                SELECT 
-                    company, income_type,
-                    project, 
-                    account, 
-                    percentage, 
-                    min_percent, 
-                    max_percent
-                FROM 
-                    `tabDeduction Details` dd
-                WHERE 
-                    ifnull(account, "") != ""
-                    and company = '{company}'
-                    and parenttype = "Fund Class"
-                    and parent = '{row.get("fund_class")}'
-            """, as_dict=True)
-            
-            return result
+            # Deduction details pre-fetched for all fund classes of the donation
+            return deduction_details_by_fund_class.get(row.get("fund_class"), [])
         
         def set_deduction_details(row, args):
             # EXACT backend logic for setting deduction details
@@ -248,15 +233,12 @@ def set_deduction_breakeven(payment_details, company, contribution_type, donatio
             return deduction_row
         
         def get_default_accounts(fund_class, fieldname):
-            # EXACT backend logic
-            return frappe.db.get_value('Accounts Default', {
-                'parent': fund_class, 
-                'company': company
-            }, fieldname)
+            # EXACT backend logic, from the pre-fetched accounts
+            return accounts_by_parent.get(fund_class, {}).get(fieldname)
         
         def get_default_donor_account(donor_id, fieldname):
-            # EXACT backend logic
-            return frappe.db.get_value('Donor', {'name': donor_id}, fieldname)
+            # EXACT backend logic, from the pre-fetched donors
+            return donors_by_name.get(donor_id, {}).get(fieldname)
         
         def verify_unique_receipt_no(row):
             # EXACT backend logic
@@ -271,12 +253,12 @@ def set_deduction_breakeven(payment_details, company, contribution_type, donatio
         
         def validate_active_donor(row):
             # EXACT backend logic
-            if frappe.db.exists("Donor", {"name": row.get('donor'), "status": "Blocked"}):
+            if donors_by_name.get(row.get('donor'), {}).get("status") == "Blocked":
                 frappe.throw(f"<b>Row#{row.get('idx')}</b> donor: {row.get('donor')} is blocked.", title='Blocked Donor.')
         
         def validate_donor_currency(row):
             # EXACT backend logic
-            if currency and not frappe.db.exists("Donor", {"name": row.get('donor'), "default_currency": currency}):
+            if currency and donors_by_name.get(row.get('donor'), {}).get("default_currency") != currency:
                 donor_id = get_link_to_form("Donor", row.get('donor'))
                 frappe.throw(f"<b>Row#{row.get('idx')}</b> donor: {donor_id} currency is not {currency}.", title='Currency conflict')
         
@@ -294,6 +276,11 @@ def set_deduction_breakeven(payment_details, company, contribution_type, donatio
         def set_total_donors():
             return len(payment_details)
         
+        # Load deduction details, donors and default accounts of all rows at once
+        deduction_details_by_fund_class, donors_by_name, accounts_by_parent = prefetch_deduction_breakeven_data(
+            normalized_payment_details, company
+        )
+        
         # Main processing logic (EXACT backend replication)
         deduction_breakeven = existing_deduction_breakeven or []
         deduction_breakeven_rows = []
@@ -363,6 +350,62 @@ def set_deduction_breakeven(payment_details, company, contribution_type, donatio
         # return {"success": False, "message": f"Error setting deduction breakeven: {str(e)}"}
         return {} 
 
+def prefetch_deduction_breakeven_data(payment_details, company):
+    """
+    Load everything set_deduction_breakeven needs for the payment rows in one query each:
+    deduction details per fund class, donors by name and default accounts by parent.
+    """
+    fund_classes = {row.get('fund_class') for row in payment_details if row.get('fund_class')}
+    donors = {row.get('donor') for row in payment_details if row.get('donor')}
+    account_parents = fund_classes | {
+        row.get('pay_service_area') for row in payment_details if row.get('pay_service_area')
+    }
+    
+    deduction_details_by_fund_class = {}
+    if fund_classes:
+        for detail in frappe.db.sql("""
+            SELECT 
+                parent, company, income_type,
+                project, 
+                account, 
+                percentage, 
+                min_percent, 
+                max_percent
+            FROM 
+                `tabDeduction Details` dd
+            WHERE 
+                ifnull(account, "") != ""
+                and company = %(company)s
+                and parenttype = "Fund Class"
+                and parent in %(fund_classes)s
+            ORDER BY idx
+        """, {"company": company, "fund_classes": list(fund_classes)}, as_dict=True):
+            deduction_details_by_fund_class.setdefault(detail.pop("parent"), []).append(detail)
+    
+    donors_by_name = {}
+    if donors:
+        donors_by_name = {
+            donor.name: donor
+            for donor in frappe.get_all(
+                "Donor",
+                filters={"name": ["in", list(donors)]},
+                fields=["name", "status", "default_currency", "default_account"],
+            )
+        }
+    
+    accounts_by_parent = {}
+    if account_parents:
+        for account in frappe.get_all(
+            "Accounts Default",
+            filters={"parent": ["in", list(account_parents)], "company": company},
+            fields=["parent", "equity_account", "receivable_account"],
+            order_by="idx asc",
+        ):
+            # first row per parent, like frappe.db.get_value
+            accounts_by_parent.setdefault(account.parent, account)
+    
+    return deduction_details_by_fund_class, donors_by_name, accounts_by_parent
+
 @frappe.whitelist()
 def update_deduction_breakeven(payment_details, deduction_breakeven, company, contribution_type, 
                               donation_cost_center, currency=None, to_currency=None, exchange_rate=None, 
@@ -823,8 +866,9 @@ def apply_currency_exchange(amount, from_currency, to_currency, posting_date):
         if from_currency == to_currency:
             return amount
         
-        from erpnext.setup.utils import get_exchange_rate
-        exchange_rate = get_exchange_rate(from_currency, to_currency, posting_date)
+        exchange_rate = get_cached_exchange_rate(
+            from_currency, to_currency, posting_date, provider=get_exchange_rate
+        )
         
         if exchange_rate:
             return amount * exchange_rate
@@ -1128,7 +1172,9 @@ def get_exchange_rate_api(from_currency, to_currency, posting_date=None):
         if from_currency == to_currency:
             return {"success": True, "exchange_rate": 1.0}
         
-        exchange_rate = get_exchange_rate(from_currency, to_currency, posting_date)
+        exchange_rate = get_cached_exchange_rate(
+            from_currency, to_currency, posting_date, provider=get_exchange_rate
+        )
         
         if exchange_rate:
             return {"success": True, "exchange_rate": exchange_rate}
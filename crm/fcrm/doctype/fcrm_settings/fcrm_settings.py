@@ -7,6 +7,7 @@ from frappe import _
 from frappe.custom.doctype.property_setter.property_setter import delete_property_setter, make_property_setter
 from frappe.model.document import Document
 
+from crm.fcrm.doctype.crm_exchange_rate.crm_exchange_rate import get_cached_exchange_rate
 from crm.install import after_install
 
 
@@ -136,6 +137,10 @@ def get_forecasting_script():
 
 
 def get_exchange_rate(from_currency, to_currency, date=None):
+	return get_cached_exchange_rate(from_currency, to_currency, date, provider=fetch_exchange_rate)
+
+
+def fetch_exchange_rate(from_currency, to_currency, date=None):
 	if not date:
 		date = "latest"
 
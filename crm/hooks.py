@@ -132,8 +132,30 @@ before_uninstall = "crm.uninstall.before_uninstall"
 override_doctype_class = {
 	"Contact": "crm.overrides.contact.CustomContact",
 	"Email Template": "crm.overrides.email_template.CustomEmailTemplate",
+	"Email Group Member": "crm.overrides.email_group_member.CustomEmailGroupMember",
 }
 
+# List view counts of these doctypes are cached, see crm.api.list_count
+list_count_cache_doctypes = [
+	"Address",
+	"Campaign",
+	"Communication",
+	"Contact",
+	"CRM Call Log",
+	"CRM Deal",
+	"CRM Lead",
+	"CRM Organization",
+	"CRM Task",
+	"Donation",
+	"Donor",
+	"Email Campaign",
+	"Email Group",
+	"Email Group Member",
+	"Email Template",
+	"FCRM Note",
+	"Tax Exemption Certificate",
+]
+
 # Document Events
 # ---------------
 # Hook on document methods and events
@@ -141,6 +163,8 @@ override_doctype_class = {
 doc_events = {
 	"Contact": {
 		"validate": ["crm.api.contact.validate"],
+		"on_update": ["crm.fcrm.doctype.crm_phone_index.crm_phone_index.update_phone_index"],
+		"on_trash": ["crm.fcrm.doctype.crm_phone_index.crm_phone_index.update_phone_index"],
 	},
 	"ToDo": {
 		"after_insert": ["crm.api.todo.after_insert"],
@@ -153,24 +177,77 @@ doc_events = {
 		"validate": ["crm.api.whatsapp.validate"],
 		"on_update": ["crm.api.whatsapp.on_update"],
 	},
+	"CRM Lead": {
+		"on_update": [
+			"crm.fcrm.doctype.crm_dashboard_rollup.crm_dashboard_rollup.update_dashboard_rollup",
+			"crm.fcrm.doctype.crm_phone_index.crm_phone_index.update_phone_index",
+		],
+		"on_trash": [
+			"crm.fcrm.doctype.crm_dashboard_rollup.crm_dashboard_rollup.update_dashboard_rollup",
+			"crm.fcrm.doctype.crm_phone_index.crm_phone_index.update_phone_index",
+		],
+	},
 	"CRM Deal": {
 		"on_update": [
-			"crm.fcrm.doctype.erpnext_crm_settings.erpnext_crm_settings.create_customer_in_erpnext"
+			"crm.fcrm.doctype.erpnext_crm_settings.erpnext_crm_settings.create_customer_in_erpnext",
+			"crm.fcrm.doctype.crm_dashboard_rollup.crm_dashboard_rollup.update_dashboard_rollup",
+			"crm.fcrm.doctype.crm_phone_index.crm_phone_index.update_phone_index",
+		],
+		"on_trash": [
+			"crm.fcrm.doctype.crm_dashboard_rollup.crm_dashboard_rollup.update_dashboard_rollup",
+			"crm.fcrm.doctype.crm_phone_index.crm_phone_index.update_phone_index",
 		],
 	},
+	"Donation": {
+		"on_submit": ["crm.fcrm.doctype.crm_donor_summary.crm_donor_summary.update_donor_summary"],
+		"on_cancel": ["crm.fcrm.doctype.crm_donor_summary.crm_donor_summary.update_donor_summary"],
+	},
+	"Donor": {
+		"on_update": ["crm.fcrm.doctype.crm_phone_index.crm_phone_index.update_phone_index"],
+		"on_trash": ["crm.fcrm.doctype.crm_phone_index.crm_phone_index.update_phone_index"],
+	},
+	"DocType": {
+		"on_update": ["crm.api.activities.clear_version_cache"],
+	},
+	"Custom Field": {
+		"on_update": ["crm.api.activities.clear_version_cache"],
+		"on_trash": ["crm.api.activities.clear_version_cache"],
+	},
+	"Property Setter": {
+		"on_update": ["crm.api.activities.clear_version_cache"],
+		"on_trash": ["crm.api.activities.clear_version_cache"],
+	},
 	"User": {
 		"before_validate": ["crm.api.demo.validate_user"],
 		"validate_reset_password": ["crm.api.demo.validate_reset_password"],
 	},
-    	"Email Group Member": {
-		"on_update": "crm.api.extended_email_campaign.update_email_group_total_on_member_update",
-		"on_trash": "crm.api.extended_email_campaign.update_email_group_total_on_member_update",
+	"Email Group Member": {
+		"on_update": ["crm.api.extended_email_campaign.update_email_group_total_on_member_update"],
+		"on_trash": ["crm.api.extended_email_campaign.update_email_group_total_on_member_update"],
 	},
 }
 
+# cached list view counts are cleared on changes of their doctypes only
+for _doctype in list_count_cache_doctypes:
+	for _event in ("on_update", "on_submit", "on_cancel", "on_trash"):
+		doc_events.setdefault(_doctype, {}).setdefault(_event, []).append(
+			"crm.api.list_count.clear_count_cache"
+		)
+
 # Scheduled Tasks
 # ---------------
 
+scheduler_events = {
+	"cron": {
+		"*/5 * * * *": [
+			"crm.fcrm.doctype.crm_service_level_agreement.utils.mark_failed_first_responses",
+		],
+	},
+	"daily_long": [
+		"crm.fcrm.doctype.crm_dashboard_rollup.crm_dashboard_rollup.rebuild_dashboard_rollup",
+	],
+}
+
 # scheduler_events = {
 # "all": [
 # "crm.tasks.all"
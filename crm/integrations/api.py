@@ -1,8 +1,6 @@
 import frappe
-from frappe.query_builder import Order
-from pypika.functions import Replace
 
-from crm.utils import are_same_phone_number, parse_phone_number
+from crm.utils import normalize_phone_number
 
 
 @frappe.whitelist()
@@ -107,75 +105,85 @@ def add_task_to_call_log(call_sid, task):
 @frappe.whitelist()
 def get_contact_by_phone_number(phone_number):
 	"""Get contact by phone number."""
-	number = parse_phone_number(phone_number)
-
-	if number.get("is_valid"):
-		return get_contact(number.get("national_number"), number.get("country"))
-	else:
-		return get_contact(phone_number, number.get("country"), exact_match=True)
-
-
-def get_contact(phone_number, country="IN", exact_match=False):
-	if not phone_number:
-		return {"mobile_no": phone_number}
-
-	cleaned_number = (
-		phone_number.strip()
-		.replace(" ", "")
-		.replace("-", "")
-		.replace("(", "")
-		.replace(")", "")
-		.replace("+", "")
-	)
-
-	# Check if the number is associated with a contact
-	Contact = frappe.qb.DocType("Contact")
-	normalized_phone = Replace(
-		Replace(Replace(Replace(Replace(Contact.mobile_no, " ", ""), "-", ""), "(", ""), ")", ""), "+", ""
+	return get_contacts_by_phone_numbers([phone_number])[phone_number]
+
+
+def get_contacts_by_phone_numbers(phone_numbers):
+	"""
+	Resolve many phone numbers at once, returns `{phone_number: contact}` with the same contacts
+	`get_contact_by_phone_number` returns, using a fixed number of queries.
+	"""
+	# read in the system country, like the numbers in the index
+	phones = {number: normalize_phone_number(number) for number in set(phone_numbers) if number}
+	callers = find_callers({phone for phone in phones.values() if phone})
+	return {number: callers.get(phones.get(number)) or {"mobile_no": number} for number in phone_numbers}
+
+
+def find_callers(phones):
+	"""
+	Map E.164 numbers to the contact (preferring the primary contact of a deal) or else the
+	unconverted lead having that number.
+	"""
+	if not phones:
+		return {}
+
+	matches = frappe.get_all(
+		"CRM Phone Index",
+		filters={"phone": ["in", list(phones)], "reference_doctype": ["in", ["Contact", "CRM Lead"]]},
+		fields=["phone", "reference_doctype", "reference_name"],
 	)
+	contact_names = {m.reference_name for m in matches if m.reference_doctype == "Contact"}
+	lead_names = {m.reference_name for m in matches if m.reference_doctype == "CRM Lead"}
+
+	contacts, deals, leads = {}, {}, {}
+	if contact_names:
+		Contact = frappe.qb.DocType("Contact")
+		contacts = {
+			c.name: c
+			for c in frappe.qb.from_(Contact)
+			.select(Contact.name, Contact.full_name, Contact.image, Contact.mobile_no, Contact.modified)
+			.where(Contact.name.isin(list(contact_names)))
+			.run(as_dict=True)
+		}
+		deals = dict(
+			frappe.get_all(
+				"CRM Contacts",
+				filters={"contact": ["in", list(contact_names)], "is_primary": 1},
+				fields=["contact", "parent"],
+				as_list=True,
+			)
+		)
 
-	query = (
-		frappe.qb.from_(Contact)
-		.select(Contact.name, Contact.full_name, Contact.image, Contact.mobile_no)
-		.where(normalized_phone.like(f"%{cleaned_number}%"))
-		.orderby("modified", order=Order.desc)
-	)
-	contacts = query.run(as_dict=True)
-
-	if len(contacts):
-		# Check if the contact is associated with a deal
-		for contact in contacts:
-			if frappe.db.exists("CRM Contacts", {"contact": contact.name, "is_primary": 1}):
-				deal = frappe.db.get_value(
-					"CRM Contacts", {"contact": contact.name, "is_primary": 1}, "parent"
-				)
-				if are_same_phone_number(contact.mobile_no, phone_number, country, validate=not exact_match):
-					contact["deal"] = deal
-					return contact
-		# Else, return the first contact
-		if are_same_phone_number(contacts[0].mobile_no, phone_number, country, validate=not exact_match):
-			return contacts[0]
-
-	# Else, Check if the number is associated with a lead
-	Lead = frappe.qb.DocType("CRM Lead")
-	normalized_phone = Replace(
-		Replace(Replace(Replace(Replace(Lead.mobile_no, " ", ""), "-", ""), "(", ""), ")", ""), "+", ""
-	)
+	if lead_names:
+		Lead = frappe.qb.DocType("CRM Lead")
+		leads = {
+			lead.name: lead
+			for lead in frappe.qb.from_(Lead)
+			.select(Lead.name, Lead.lead_name, Lead.image, Lead.mobile_no, Lead.modified)
+			.where(Lead.name.isin(list(lead_names)))
+			.where(Lead.converted == 0)
+			.run(as_dict=True)
+		}
+
+	callers = {}
+	for phone in phones:
+		names = {m.reference_name for m in matches if m.phone == phone}
+		phone_contacts = sorted(
+			(contacts[name] for name in names if name in contacts), key=lambda c: c.modified, reverse=True
+		)
+		phone_leads = sorted(
+			(leads[name] for name in names if name in leads), key=lambda lead: lead.modified, reverse=True
+		)
 
-	query = (
-		frappe.qb.from_(Lead)
-		.select(Lead.name, Lead.lead_name, Lead.image, Lead.mobile_no)
-		.where(Lead.converted == 0)
-		.where(normalized_phone.like(f"%{cleaned_number}%"))
-		.orderby("modified", order=Order.desc)
-	)
-	leads = query.run(as_dict=True)
+		if contact := next((c for c in phone_contacts if c.name in deals), None):
+			callers[phone] = {**contact, "deal": deals[contact.name]}
+		elif phone_contacts:
+			callers[phone] = dict(phone_contacts[0])
+		elif phone_leads:
+			lead = phone_leads[0]
+			callers[phone] = {**lead, "lead": lead.name, "full_name": lead.lead_name}
 
-	if len(leads):
-		for lead in leads:
-			if are_same_phone_number(lead.mobile_no, phone_number, country, validate=not exact_match):
-				lead["lead"] = lead.name
-				lead["full_name"] = lead.lead_name
-				return lead
+	for caller in callers.values():
+		caller.pop("modified")
 
-	return {"mobile_no": phone_number}
+	return {phone: frappe._dict(caller) for phone, caller in callers.items()}
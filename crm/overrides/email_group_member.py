@@ -0,0 +1,12 @@
+from frappe.email.doctype.email_group_member.email_group_member import EmailGroupMember
+
+from crm.api.email_group import mark_email_group_dirty
+
+
+class CustomEmailGroupMember(EmailGroupMember):
+	# the subscriber count is recomputed once per transaction instead of after every member
+	def after_insert(self):
+		mark_email_group_dirty(self.email_group)
+
+	def after_delete(self):
+		mark_email_group_dirty(self.email_group)
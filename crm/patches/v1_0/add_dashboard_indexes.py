@@ -0,0 +1,5 @@
+from crm.install import add_dashboard_indexes
+
+
+def execute():
+	add_dashboard_indexes()
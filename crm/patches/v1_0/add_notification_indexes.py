@@ -0,0 +1,5 @@
+from crm.install import add_notification_indexes
+
+
+def execute():
+	add_notification_indexes()
@@ -0,0 +1,9 @@
+from crm.fcrm.doctype.crm_donor_summary.crm_donor_summary import (
+	add_donor_summary_indexes,
+	enqueue_donor_summary_rebuild,
+)
+
+
+def execute():
+	add_donor_summary_indexes()
+	enqueue_donor_summary_rebuild()
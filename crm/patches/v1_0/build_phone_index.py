@@ -0,0 +1,5 @@
+from crm.fcrm.doctype.crm_phone_index.crm_phone_index import enqueue_phone_index_rebuild
+
+
+def execute():
+	enqueue_phone_index_rebuild()
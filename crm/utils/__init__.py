@@ -1,4 +1,5 @@
 import functools
+from typing import NamedTuple
 
 import frappe
 import phonenumbers
@@ -7,34 +8,94 @@ from frappe import _
 from frappe.model.docstatus import DocStatus
 from frappe.model.dynamic_links import get_dynamic_link_map
 from frappe.utils import floor
+from frappe.utils.caching import request_cache
 from phonenumbers import NumberParseException
 from phonenumbers import PhoneNumberFormat as PNF
 
 
-def parse_phone_number(phone_number, default_country="IN"):
+PHONE_PARSE_CACHE_SIZE = 16384
+
+
+class ParsedPhoneNumber(NamedTuple):
+	"""Result of parsing a phone number, shared between callers so it is immutable."""
+
+	e164: str | None = None
+	national_number: str | None = None
+	country_code: int | None = None
+	country: str | None = None
+	is_valid: bool = False
+	is_possible: bool = False
+	error: str | None = None
+
+
+@functools.lru_cache(maxsize=PHONE_PARSE_CACHE_SIZE)
+def get_parsed_phone_number(phone_number, region="IN"):
+	"""Parse `phone_number` read in `region`. Results are kept in a bounded LRU cache."""
 	try:
-		# Parse the number
-		number = phonenumbers.parse(phone_number, default_country)
-
-		# Get various information about the number
-		result = {
-			"is_valid": phonenumbers.is_valid_number(number),
-			"country_code": number.country_code,
-			"national_number": str(number.national_number),
-			"formats": {
-				"international": phonenumbers.format_number(number, PNF.INTERNATIONAL),
-				"national": phonenumbers.format_number(number, PNF.NATIONAL),
-				"E164": phonenumbers.format_number(number, PNF.E164),
-				"RFC3966": phonenumbers.format_number(number, PNF.RFC3966),
-			},
-			"type": phonenumbers.number_type(number),
-			"country": phonenumbers.region_code_for_number(number),
-			"is_possible": phonenumbers.is_possible_number(number),
-		}
-
-		return {"success": True, **result}
+		number = phonenumbers.parse(phone_number, region)
 	except NumberParseException as e:
-		return {"success": False, "error": str(e)}
+		return ParsedPhoneNumber(error=str(e))
+
+	return ParsedPhoneNumber(
+		e164=phonenumbers.format_number(number, PNF.E164),
+		national_number=str(number.national_number),
+		country_code=number.country_code,
+		country=phonenumbers.region_code_for_number(number),
+		is_valid=phonenumbers.is_valid_number(number),
+		is_possible=phonenumbers.is_possible_number(number),
+	)
+
+
+@functools.lru_cache(maxsize=PHONE_PARSE_CACHE_SIZE)
+def get_phone_number_formats(e164):
+	number = phonenumbers.parse(e164)
+	return (
+		phonenumbers.format_number(number, PNF.INTERNATIONAL),
+		phonenumbers.format_number(number, PNF.NATIONAL),
+		phonenumbers.format_number(number, PNF.RFC3966),
+		phonenumbers.number_type(number),
+	)
+
+
+def parse_phone_number(phone_number, default_country="IN"):
+	number = get_parsed_phone_number(phone_number, default_country)
+	if number.error:
+		return {"success": False, "error": number.error}
+
+	international, national, rfc3966, number_type = get_phone_number_formats(number.e164)
+	return {
+		"success": True,
+		"is_valid": number.is_valid,
+		"country_code": number.country_code,
+		"national_number": number.national_number,
+		"formats": {
+			"international": international,
+			"national": national,
+			"E164": number.e164,
+			"RFC3966": rfc3966,
+		},
+		"type": number_type,
+		"country": number.country,
+		"is_possible": number.is_possible,
+	}
+
+
+def normalize_phone_number(phone_number, default_country=None):
+	"""
+	Return the number in E.164 format (e.g. +923001234567), or None if it can't be parsed.
+	Numbers without a country code are read in `default_country`, the system country by default.
+	"""
+	if not phone_number:
+		return None
+
+	return get_parsed_phone_number(phone_number, default_country or get_default_phone_region()).e164
+
+
+@request_cache
+def get_default_phone_region():
+	country = frappe.db.get_default("country")
+	code = country and frappe.db.get_value("Country", country, "code")
+	return code.upper() if code else "IN"
 
 
 def are_same_phone_number(number1, number2, default_region="IN", validate=True):
@@ -49,24 +110,18 @@ def are_same_phone_number(number1, number2, default_region="IN", validate=True):
 	Returns:
 	    bool: True if numbers are same, False otherwise
 	"""
-	try:
-		# Parse both numbers
-		parsed1 = phonenumbers.parse(number1, default_region)
-		parsed2 = phonenumbers.parse(number2, default_region)
-
-		# Check if both numbers are valid
-		if validate and not (phonenumbers.is_valid_number(parsed1) and phonenumbers.is_valid_number(parsed2)):
-			return False
-
-		# Convert both to E164 format and compare
-		formatted1 = phonenumbers.format_number(parsed1, phonenumbers.PhoneNumberFormat.E164)
-		formatted2 = phonenumbers.format_number(parsed2, phonenumbers.PhoneNumberFormat.E164)
+	parsed1 = get_parsed_phone_number(number1, default_region)
+	parsed2 = get_parsed_phone_number(number2, default_region)
 
-		return formatted1 == formatted2
+	if parsed1.error or parsed2.error:
+		return False
 
-	except phonenumbers.NumberParseException:
+	# Check if both numbers are valid
+	if validate and not (parsed1.is_valid and parsed2.is_valid):
 		return False
 
+	return parsed1.e164 == parsed2.e164
+
 
 def seconds_to_duration(seconds):
 	if not seconds:
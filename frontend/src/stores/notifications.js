@@ -1,18 +1,39 @@
 import { defineStore } from 'pinia'
 import { createResource } from 'frappe-ui'
 import { computed, ref } from 'vue'
+import { call } from '@/utils/api'
 
 export const visible = ref(false)
 
+const unreadCount = ref(0)
+const nextCursor = ref(null)
+
 export const notifications = createResource({
-  url: 'crm.api.notifications.get_notifications',
+  url: 'crm.api.notifications.get_notification_page',
+  params: { page_length: 50 },
   initialData: [],
   auto: true,
+  transform(data) {
+    unreadCount.value = data.unread_count
+    nextCursor.value = data.next_cursor
+    return data.notifications
+  },
 })
 
-export const unreadNotificationsCount = computed(
-  () => notifications.data?.filter((n) => !n.read).length || 0,
-)
+export const unreadNotificationsCount = computed(() => unreadCount.value)
+
+export const hasMoreNotifications = computed(() => Boolean(nextCursor.value))
+
+export async function loadMoreNotifications() {
+  if (!nextCursor.value) return
+  const data = await call('crm.api.notifications.get_notification_page', {
+    page_length: 50,
+    cursor: nextCursor.value,
+  })
+  unreadCount.value = data.unread_count
+  nextCursor.value = data.next_cursor
+  notifications.setData([...(notifications.data || []), ...data.notifications])
+}
 
 export const notificationsStore = defineStore('crm-notifications', () => {
   const mark_as_read = createResource({